@@ -0,0 +1,288 @@
+"""
+Headless batch spell checker
+File: batch_check.py
+
+Checks files (or stdin) line by line without any GUI and writes one JSON
+object per misspelled word (JSONL). Input is streamed through a chain of
+generators, so memory use stays flat even for multi-gigabyte files:
+
+    read_lines -> tokenize -> check -> suggest -> JSONL output
+
+Usage:
+    python batch_check.py notes.txt logs/*.txt > errors.jsonl
+    cat notes.txt | python batch_check.py --dict words.dict
+    python batch_check.py --all --engine bktree notes.txt
+
+Each result looks like:
+    {"file": "notes.txt", "line": 3, "column": 10, "offset": 57,
+     "word": "teh", "correct": false, "suggestions": ["the", "ten"]}
+line and column count from 1 (column in characters), offset is the byte
+offset of the word from the start of the file.
+
+Throughput (words per second) is printed to stderr at the end.
+
+Parallel mode (--jobs N) splits the input into chunks on line boundaries,
+checks each chunk in a separate process and writes the results in input
+order. Workers open the same compiled dictionary file with mmap, so the
+dictionary is loaded once into the page cache and never pickled. Without
+--dict, the word list is compiled to a temporary file first.
+
+    python batch_check.py --jobs 32 --dict words.dict corpus/*.txt
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+
+from cache import SpellCache
+from dictionary import Trie, DEFAULT_WORDS
+from dictionary_file import compile_dictionary, open_dictionary
+from document import WORD_PATTERN
+from engines import ENGINES, DEFAULT_ENGINE, create_engine
+
+
+# --------- Pipeline stages ---------
+def read_lines(stream, first_line=1, offset=0):
+    """
+    Yield (line_number, byte_offset, text) for each line of a binary stream.
+    Invalid UTF-8 bytes become lone surrogates, so encoding the text back
+    (see tokenize) gives exactly the original bytes and offsets stay right.
+    """
+    for line_number, raw in enumerate(stream, start=first_line):
+        yield line_number, offset, raw.decode('utf-8', errors='surrogateescape')
+        offset += len(raw)
+
+
+def tokenize(lines):
+    """Yield (word, line_number, column, byte_offset) for each word"""
+    for line_number, line_offset, text in lines:
+        byte_offset = line_offset
+        position = 0
+        for match in WORD_PATTERN.finditer(text):
+            start = match.start()
+            # Count bytes only for the text since the previous word
+            byte_offset += len(text[position:start].encode('utf-8', errors='surrogateescape'))
+            position = start
+            yield match.group(0), line_number, start + 1, byte_offset
+
+
+def check(tokens, dictionary):
+    """Yield (token, is_correct), skipping single letters like the GUI does"""
+    for token in tokens:
+        word = token[0]
+        if len(word) == 1:
+            continue
+        yield token, dictionary.word_exists(word)
+
+
+def suggest(checked, engine, max_distance, limit):
+    """Yield (token, is_correct, suggestions); only misses get suggestions"""
+    for token, correct in checked:
+        suggestions = []
+        if not correct:
+            suggestions = [w for _, w in engine.suggest(token[0].lower(), max_distance, limit)]
+        yield token, correct, suggestions
+
+
+# --------- Running it ---------
+def load_dictionary(dictionary_path=None, words_path=None):
+    """Open a compiled dictionary, load a word list, or use the built-in words"""
+    if dictionary_path:
+        return open_dictionary(dictionary_path)
+    dictionary = Trie()
+    if words_path:
+        dictionary.load_word_list(words_path)
+    else:
+        for word in DEFAULT_WORDS:
+            dictionary.add_word(word)
+    return dictionary
+
+
+def create_suggestion_engine(name, dictionary, max_distance):
+    """Build the suggestion engine (the deletes index must cover max_distance)"""
+    options = {"max_distance": max_distance} if name == "deletes" else {}
+    return create_engine(name, dictionary, **options)
+
+
+def create_cache(dictionary, engine, cache_size):
+    """Cache in front of the dictionary and engine (it answers for both), or None"""
+    if cache_size <= 0:
+        return None
+    return SpellCache(dictionary.word_exists, engine.suggest, dictionary, maxsize=cache_size)
+
+
+def check_stream(stream, name, dictionary, engine, output, max_distance=2, limit=5, show_all=False,
+                 first_line=1, offset=0):
+    """Check one binary stream, write JSONL to output, return (words, misses)"""
+    words = 0
+    misses = 0
+    tokens = tokenize(read_lines(stream, first_line, offset))
+    for (word, line, column, offset), correct, suggestions in suggest(check(tokens, dictionary), engine, max_distance, limit):
+        words += 1
+        if correct and not show_all:
+            continue
+        if not correct:
+            misses += 1
+        result = {
+            "file": name,
+            "line": line,
+            "column": column,
+            "offset": offset,
+            "word": word,
+            "correct": correct,
+            "suggestions": suggestions,
+        }
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return words, misses
+
+
+# --------- Parallel mode ---------
+# Set in each worker process by _init_worker
+_worker = {}
+
+
+def _init_worker(dictionary_path, engine_name, max_distance, limit, show_all, cache_size):
+    """Open the shared dictionary file once per worker process"""
+    dictionary = open_dictionary(dictionary_path)
+    engine = create_suggestion_engine(engine_name, dictionary, max_distance)
+    cache = create_cache(dictionary, engine, cache_size)
+    _worker["dictionary"] = cache or dictionary
+    _worker["engine"] = cache or engine
+    _worker["options"] = (max_distance, limit, show_all)
+
+
+def _check_chunk(data, name, first_line, offset):
+    """Worker: check one chunk of lines, return (jsonl_text, words, misses)"""
+    max_distance, limit, show_all = _worker["options"]
+    output = io.StringIO()
+    words, misses = check_stream(io.BytesIO(data), name, _worker["dictionary"], _worker["engine"], output,
+                                 max_distance, limit, show_all, first_line, offset)
+    return output.getvalue(), words, misses
+
+
+def read_chunks(stream, chunk_size):
+    """Yield (data, first_line, byte_offset) chunks that end on a line boundary"""
+    line = 1
+    offset = 0
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            return
+        if not data.endswith(b"\n"):
+            data += stream.readline()  # Finish the last line
+        yield data, line, offset
+        line += data.count(b"\n")
+        offset += len(data)
+
+
+def check_parallel(inputs, dictionary_path, engine_name, output, jobs, chunk_size,
+                   max_distance=2, limit=5, show_all=False, cache_size=0):
+    """
+    Check (name, stream) inputs on a process pool, writing results in input order.
+    At most two chunks per worker are in flight, so memory stays bounded.
+    """
+    total_words = 0
+    total_misses = 0
+    initargs = (dictionary_path, engine_name, max_distance, limit, show_all, cache_size)
+
+    with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque()
+
+        def write_oldest():
+            nonlocal total_words, total_misses
+            text, words, misses = pending.popleft().get()
+            output.write(text)
+            total_words += words
+            total_misses += misses
+
+        for name, stream in inputs:
+            for data, first_line, offset in read_chunks(stream, chunk_size):
+                pending.append(pool.apply_async(_check_chunk, (data, name, first_line, offset)))
+                if len(pending) >= jobs * 2:
+                    write_oldest()
+        while pending:
+            write_oldest()
+
+    return total_words, total_misses
+
+
+def _open_inputs(files):
+    """Helper: yield (name, binary stream) for each file, '-' meaning stdin"""
+    for name in files:
+        if name == "-":
+            yield "<stdin>", sys.stdin.buffer
+        else:
+            with open(name, 'rb') as f:
+                yield name, f
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Spell check files or stdin and write JSONL results")
+    parser.add_argument("files", nargs="*", default=["-"], help="files to check ('-' or nothing for stdin)")
+    parser.add_argument("--dict", dest="dictionary_path", help="compiled dictionary file (see dictionary_file.py)")
+    parser.add_argument("--words", dest="words_path", help="word list: one word per line, optionally with a count")
+    parser.add_argument("--engine", choices=list(ENGINES), default=DEFAULT_ENGINE,
+                        help="how to find suggestions (default: %(default)s)")
+    parser.add_argument("--max-distance", type=int, default=2, help="most changes for a suggestion (default: 2)")
+    parser.add_argument("--limit", type=int, default=5, help="most suggestions per word (default: 5)")
+    parser.add_argument("--all", dest="show_all", action="store_true", help="also write correctly spelled words")
+    parser.add_argument("--cache-size", type=int, default=10000,
+                        help="words to remember verdicts and suggestions for (0 = off, default: 10000)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="worker processes (0 = one per core, default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=8,
+                        help="megabytes of input per parallel chunk (default: 8)")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    output = sys.stdout
+    start = time.perf_counter()
+    total_words = 0
+    total_misses = 0
+    jobs = args.jobs or os.cpu_count()
+
+    if jobs > 1:
+        temp_dir = None
+        dictionary_path = args.dictionary_path
+        if not dictionary_path:
+            # Compile once so every worker can map the same file
+            temp_dir = tempfile.mkdtemp(prefix="spellcheck-")
+            dictionary_path = os.path.join(temp_dir, "words.dict")
+            index_distance = args.max_distance if args.engine == "deletes" else 0
+            compile_dictionary(load_dictionary(words_path=args.words_path), dictionary_path, index_distance)
+        try:
+            total_words, total_misses = check_parallel(
+                _open_inputs(args.files), dictionary_path, args.engine, output, jobs,
+                args.chunk_size * 1024 * 1024, args.max_distance, args.limit, args.show_all, args.cache_size)
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+    else:
+        dictionary = load_dictionary(args.dictionary_path, args.words_path)
+        engine = create_suggestion_engine(args.engine, dictionary, args.max_distance)
+        cache = create_cache(dictionary, engine, args.cache_size)
+        if cache:
+            dictionary = engine = cache
+        for name, stream in _open_inputs(args.files):
+            words, misses = check_stream(stream, name, dictionary, engine, output,
+                                         args.max_distance, args.limit, args.show_all)
+            total_words += words
+            total_misses += misses
+
+    output.flush()
+    elapsed = time.perf_counter() - start
+    rate = total_words / elapsed if elapsed > 0 else 0
+    print(f"Checked {total_words} words ({total_misses} misspelled) in {elapsed:.2f}s "
+          f"- {rate:,.0f} words/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+"""
+Benchmarks for the hot paths
+File: benchmark.py
+
+Builds dictionaries of several sizes and times the operations that matter:
+
+    add_word            building the Trie, one word at a time
+    word_exists         half known words, half misspellings
+    find_suggestions    completions for short prefixes
+    calculate_difference  the reference edit distance, on random word pairs
+    find_similar        suggestions for misspellings, per engine (what
+                        find_similar_words in the GUIs asks for)
+    find_sound_alikes   phonetic-index lookups for the same misspellings
+    check_document      a whole document through document.check_document,
+                        as spell_checker_tk's check does
+
+With --startup, it instead times how an app starts, each run in a fresh
+interpreter: importing the app module, the app's own background load
+(spell_checker.build_dictionary or spell_checker_tk's SpellBackend.preload,
+without opening a window), and the first lookup, completion and suggestion.
+
+With --highlight, it times highlighting a large document (5 MB by default)
+in spell_checker_tk without a window: the check, turning the misspellings'
+offsets into "line.col" indices (and into the old "1.0 + N chars" ones, for
+comparison) and building the batched tag_add arguments. Tk resolves a
+"1.0 + N chars" index by walking the text from the start, so most of the
+saving is inside Tk; when a display is available, the tag_add calls are
+timed too (batched "line.col" against one "+ N chars" call per word).
+
+Every benchmark reports throughput, latency percentiles and peak memory
+(tracemalloc, measured in a second run so it doesn't slow the timings).
+Words are synthetic (random letters, fixed --seed) or sampled from a real
+word list (--words); the same seed always gives the same dictionary and
+queries, so runs can be compared.
+
+Usage:
+    python benchmark.py --save baseline.json
+    python benchmark.py --compare baseline.json     # flags regressions, exit code 1
+    python benchmark.py --sizes 1000,100000 --words words.txt --engines trie,deletes
+    python benchmark.py --startup spell_checker_tk --dict big.dict --runs 20
+    python benchmark.py --highlight 5 --words words.txt
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from dictionary import Trie, calculate_difference
+from document import check_document
+from engines import ENGINES, create_engine
+
+DEFAULT_SIZES = "1000,100000,1000000"
+# Letters weighted roughly like English, so synthetic words share prefixes like real ones
+LETTER_WEIGHTS = {
+    'e': 12, 't': 9, 'a': 8, 'o': 8, 'i': 7, 'n': 7, 's': 6, 'h': 6, 'r': 6, 'd': 4,
+    'l': 4, 'c': 3, 'u': 3, 'm': 2, 'w': 2, 'f': 2, 'g': 2, 'y': 2, 'p': 2, 'b': 1,
+    'v': 1, 'k': 1, 'j': 1, 'x': 1, 'q': 1, 'z': 1,
+}
+# How many times each operation is run (per dictionary size)
+LOOKUPS = 20000
+PREFIXES = 5000
+DISTANCE_PAIRS = 2000
+SIMILAR_QUERIES = 50
+DOCUMENT_WORDS = 50000
+DOCUMENT_RUNS = 5
+STARTUP_RUNS = 10
+HIGHLIGHT_WORDS = 100000
+HIGHLIGHT_RUNS = 5
+
+STARTUP_MODULES = ("spell_checker", "spell_checker_tk")
+# Run in a fresh interpreter by benchmark_startup: argv is module, engine, dictionary path ("" = built-in words).
+# "load" is what each app runs in the background at startup; the first query uses the app's own limits.
+STARTUP_SCRIPT = """
+import json, sys, time
+clock = time.perf_counter
+module, engine_name, path = sys.argv[1:4]
+
+start = clock()
+app = __import__(module)
+imported = clock()
+
+if module == "spell_checker":
+    dictionary, engine = app.build_dictionary(engine_name, path or None)
+    max_distance, limit = 3, 8
+else:
+    domains = [("domain", path)] if path else []
+    backend = app.SpellBackend(engine_name, domains=domains)
+    engine = backend.preload()
+    dictionary = backend.dictionary
+    max_distance, limit = 2, 6
+loaded = clock()
+
+dictionary.word_exists("recieve")
+dictionary.find_suggestions("th")
+engine.suggest("recieve", max_distance, limit)
+first = clock()
+
+print(json.dumps({"import": imported - start, "load": loaded - imported, "first_query": first - loaded}))
+"""
+
+
+# --------- Test data ---------
+def synthetic_words(count, rng):
+    """count distinct random words of 2-12 letters"""
+    letters = list(LETTER_WEIGHTS)
+    weights = list(LETTER_WEIGHTS.values())
+    words = set()
+    while len(words) < count:
+        length = min(12, max(2, int(rng.gauss(7, 2))))
+        words.add("".join(rng.choices(letters, weights, k=length)))
+    return sorted(words)
+
+
+def real_words(path, count, rng):
+    """Up to count distinct words from a word list (one per line, optionally with a count)"""
+    words = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if parts:
+                words.add(parts[0].lower())
+    words = sorted(words)
+    if len(words) > count:
+        words = sorted(rng.sample(words, count))
+    return words
+
+
+def misspell(word, rng):
+    """Make one random change to a word"""
+    position = rng.randrange(len(word) + 1)
+    letter = rng.choice(string.ascii_lowercase)
+    change = rng.choice(("insert", "delete", "replace"))
+    if change == "insert" or len(word) < 2:
+        return word[:position] + letter + word[position:]
+    position = min(position, len(word) - 1)
+    if change == "delete":
+        return word[:position] + word[position + 1:]
+    return word[:position] + letter + word[position + 1:]
+
+
+def make_document(words, count, rng):
+    """Text of count words where about 1 in 20 is misspelled, Zipf-ish so words repeat"""
+    common = words[:max(1, min(len(words), 5000))]
+    tokens = []
+    for _ in range(count):
+        word = common[min(len(common) - 1, int(rng.paretovariate(1.2)) - 1)]
+        if rng.random() < 0.05:
+            word = misspell(word, rng)
+        tokens.append(word)
+    lines = [" ".join(tokens[i:i + 12]) for i in range(0, len(tokens), 12)]
+    return "\n".join(lines)
+
+
+# --------- Measuring ---------
+def percentile(ordered, p):
+    index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+    return ordered[index]
+
+
+def summarize(times, ops_per_call=1):
+    """Throughput and latency percentiles (in microseconds) from per-call times in seconds"""
+    ordered = sorted(times)
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "ops_per_sec": round(len(ordered) * ops_per_call / total, 1) if total > 0 else 0.0,
+        "p50_us": round(percentile(ordered, 50) * 1e6, 2),
+        "p90_us": round(percentile(ordered, 90) * 1e6, 2),
+        "p99_us": round(percentile(ordered, 99) * 1e6, 2),
+        "max_us": round(ordered[-1] * 1e6, 2),
+    }
+
+
+def time_calls(func, inputs):
+    """Call func(item) for every item, return the time of each call"""
+    clock = time.perf_counter
+    times = []
+    for item in inputs:
+        start = clock()
+        func(item)
+        times.append(clock() - start)
+    return times
+
+
+def peak_memory(func, inputs):
+    """Peak bytes allocated while calling func(item) for every item"""
+    tracemalloc.start()
+    try:
+        for item in inputs:
+            func(item)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(func, inputs, measure_memory, ops_per_call=1):
+    """Time the calls, then (optionally) run them again for peak memory"""
+    result = summarize(time_calls(func, inputs), ops_per_call)
+    result["peak_kb"] = round(peak_memory(func, inputs) / 1024, 1) if measure_memory else None
+    return result
+
+
+def build_trie(words):
+    trie = Trie()
+    for word in words:
+        trie.add_word(word)
+    return trie
+
+
+def show(name, result):
+    print(f"{name:<30} {result['ops_per_sec']:>14,.0f} ops/s  p50 {result['p50_us']:>10} us  "
+          f"p99 {result['p99_us']:>10} us  peak {result['peak_kb'] or '-'} KB", file=sys.stderr)
+
+
+def benchmark_size(words, engines, rng, measure_memory):
+    """Run every benchmark on one dictionary, return name -> result"""
+    results = {}
+
+    def report(name, result):
+        results[name] = result
+        show(name, result)
+
+    trie = Trie()
+    result = run(trie.add_word, words, False)
+    if measure_memory:
+        # Whole build under tracemalloc: the memory the dictionary needs
+        result["peak_kb"] = round(peak_memory(build_trie, [words]) / 1024, 1)
+    report("add_word", result)
+
+    known = rng.choices(words, k=LOOKUPS // 2)
+    lookups = known + [misspell(w, rng) for w in rng.choices(words, k=LOOKUPS // 2)]
+    rng.shuffle(lookups)
+    report("word_exists", run(trie.word_exists, lookups, measure_memory))
+
+    prefixes = [w[:rng.randint(1, min(4, len(w)))] for w in rng.choices(words, k=PREFIXES)]
+    report("find_suggestions", run(trie.find_suggestions, prefixes, measure_memory))
+
+    pairs = [(rng.choice(words), rng.choice(words)) for _ in range(DISTANCE_PAIRS)]
+    report("calculate_difference", run(lambda pair: calculate_difference(*pair), pairs, measure_memory))
+
+    queries = [misspell(w, rng) for w in rng.choices(words, k=SIMILAR_QUERIES)]
+    for name in engines:
+        options = {"max_distance": 2} if name == "deletes" else {}
+        engine = create_engine(name, trie, **options)
+        report(f"find_similar[{name}]", run(lambda q: engine.suggest(q, 2, 8), queries, measure_memory))
+    trie.enable_phonetic_index()  # Built on first use otherwise, which would be timed too
+    report("find_sound_alikes", run(lambda q: trie.find_sound_alikes(q, 8), queries, measure_memory))
+
+    document = make_document(words, DOCUMENT_WORDS, rng)
+    report("check_document", run(lambda text: check_document(text, trie), [document] * DOCUMENT_RUNS,
+                                 measure_memory, ops_per_call=DOCUMENT_WORDS))
+    return results
+
+
+def benchmark_startup(module, engine, dictionary_path, runs):
+    """Time import, load and first query in runs fresh interpreters, return name -> result"""
+    times = {"import": [], "load": [], "first_query": [], "process": []}
+    here = os.path.dirname(os.path.abspath(__file__))
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT, module, engine, dictionary_path or ""],
+            cwd=here, capture_output=True, text=True, check=True,
+        ).stdout
+        times["process"].append(time.perf_counter() - start)
+        for name, seconds in json.loads(output).items():
+            times[name].append(seconds)
+
+    results = {}
+    for name, measured in times.items():
+        results[name] = summarize(measured)
+        results[name]["peak_kb"] = None
+        show(name, results[name])
+    return results
+
+
+def chars_indices(tokens):
+    """The "1.0 + N chars" indices spell_checker_tk used before "line.col" ones"""
+    return [(f"1.0 + {start} chars", f"1.0 + {end} chars") for _, start, end in tokens]
+
+
+def benchmark_highlight(words, megabytes, rng, runs=HIGHLIGHT_RUNS):
+    """Time highlighting a document of about megabytes MB (see the module docstring), return name -> result"""
+    import spell_checker_tk as app
+
+    results = {}
+
+    def report(name, result):
+        results[name] = result
+        show(name, result)
+
+    trie = build_trie(words)
+    sample = make_document(words, 10000, rng)  # To see how many words make megabytes MB
+    text = make_document(words, int(megabytes * 2**20 * 10000 / len(sample)), rng)
+    tokens = check_document(text, trie)
+    print(f"{len(text) / 2**20:.1f} MB, {len(tokens)} misspellings", file=sys.stderr)
+
+    report("check_document", run(lambda t: check_document(t, trie), [text] * runs, False))
+    report("indices[line.col]", run(lambda t: app.offsets_to_indices(t, tokens), [text] * runs, False))
+    report("indices[+chars]", run(chars_indices, [tokens] * runs, False))
+    indices = app.offsets_to_indices(text, tokens)
+    report("tag_arguments", run(lambda ranges: list(app.tag_batches(ranges)), [indices] * runs, False))
+
+    try:
+        root = app.tk.Tk()
+    except app.tk.TclError:
+        print("No display: the tag_add calls themselves were not timed", file=sys.stderr)
+        return results
+    widget = app.tk.Text(root)
+    widget.insert("1.0", text)
+
+    def tag_batched(ranges):
+        widget.tag_remove("misspelled", "1.0", "end")
+        for _, arguments in app.tag_batches(ranges):
+            widget.tag_add("misspelled", *arguments)
+
+    def tag_each(ranges):
+        widget.tag_remove("misspelled", "1.0", "end")
+        for start, end in ranges:
+            widget.tag_add("misspelled", start, end)
+
+    # One run each: the old way can take minutes on a big document
+    report("tag_add[line.col, batched]", run(tag_batched, [indices], False))
+    report("tag_add[+chars, each]", run(tag_each, [chars_indices(tokens)], False))
+    root.destroy()
+    return results
+
+
+# --------- Baselines ---------
+def compare(results, baseline, threshold):
+    """Print current vs baseline, return the names of the benchmarks that got worse by more than threshold"""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'p50 before':>12} {'p50 now':>12} {'change':>8} {'peak before':>12} {'peak now':>12}")
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<45} {'(new)':>12} {now['p50_us']:>12}")
+            continue
+
+        change = (now["p50_us"] - before["p50_us"]) / before["p50_us"] if before["p50_us"] else 0.0
+        slower = change > threshold
+        bigger = (now["peak_kb"] is not None and before.get("peak_kb")
+                  and now["peak_kb"] > before["peak_kb"] * (1 + threshold))
+        flag = "  <-- REGRESSION" if slower or bigger else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<45} {before['p50_us']:>12} {now['p50_us']:>12} {change:>+8.0%} "
+              f"{before.get('peak_kb') or '-':>12} {now['peak_kb'] or '-':>12}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Trie, distance and suggestion hot paths")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma-separated dictionary sizes (default: %(default)s)")
+    parser.add_argument("--words", dest="words_path",
+                        help="real word list to sample from (default: synthetic words)")
+    parser.add_argument("--engines", default="trie",
+                        help=f"comma-separated engines for find_similar (from {', '.join(ENGINES)}, default: trie)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="slowdown or growth counted as a regression (default: 0.2 = 20%%)")
+    parser.add_argument("--startup", nargs="?", const="spell_checker", choices=STARTUP_MODULES,
+                        help="time an app's import, background load and first query instead, "
+                             "without opening a window (default: spell_checker)")
+    parser.add_argument("--dict", dest="dictionary_path",
+                        help="with --startup: compiled dictionary for spell_checker, or a domain "
+                             "word list for spell_checker_tk (default: built-in words)")
+    parser.add_argument("--runs", type=int, default=STARTUP_RUNS,
+                        help="with --startup: fresh interpreters to time (default: %(default)s)")
+    parser.add_argument("--highlight", nargs="?", const=5.0, type=float, metavar="MB",
+                        help="time highlighting a document of this many MB in spell_checker_tk instead "
+                             "(default: 5; tag_add itself only with a display)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    for name in engines:
+        if name not in ENGINES:
+            parser.error(f"unknown engine '{name}' (choose from {', '.join(ENGINES)})")
+
+    results = {}
+    source = "real" if args.words_path else "synthetic"
+    if args.startup:
+        # One engine only; sizes come from the dictionary file
+        print(f"--- startup {args.startup} ({engines[0]}) ---", file=sys.stderr)
+        for name, result in benchmark_startup(args.startup, engines[0], args.dictionary_path, args.runs).items():
+            results[f"startup-{args.startup}/{name}"] = result
+        sizes = []
+    if args.highlight:
+        rng = random.Random(args.seed)
+        if args.words_path:
+            words = real_words(args.words_path, HIGHLIGHT_WORDS, rng)
+        else:
+            words = synthetic_words(HIGHLIGHT_WORDS, rng)
+        label = f"highlight-{args.highlight:g}MB"
+        print(f"--- {label} ({source} words) ---", file=sys.stderr)
+        for name, result in benchmark_highlight(words, args.highlight, rng).items():
+            results[f"{label}/{name}"] = result
+        sizes = []
+    for size in sizes:
+        rng = random.Random(args.seed)
+        if args.words_path:
+            words = real_words(args.words_path, size, rng)
+        else:
+            words = synthetic_words(size, rng)
+        label = f"{source}-{len(words)}"
+        print(f"--- {label} ---", file=sys.stderr)
+        for name, result in benchmark_size(words, engines, rng, not args.no_memory).items():
+            results[f"{label}/{name}"] = result
+
+    if args.save:
+        data = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "source": source,
+                "sizes": sizes,
+                "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        print(f"Saved results to {args.save}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+            return 1
+        print("\nNo regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
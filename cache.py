@@ -0,0 +1,123 @@
+"""
+Cache for spelling verdicts and suggestions
+File: cache.py
+
+Real text repeats the same words (and the same misspellings) over and
+over, so SpellCache remembers recent answers to "is this word correct?"
+and "what are the suggestions for it?". Keys are the lower-cased word.
+
+Answers go stale when the dictionary changes. If SpellCache is given the
+dictionary, it compares dictionary.version (bumped by Trie.add_word) on
+every call and starts over when it changed. Callers whose dictionary has
+no version (e.g. pyspellchecker) call invalidate() themselves.
+
+Both caches count hits, misses and evictions; see stats().
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Marks "not in the cache" (None and False are real answers)
+MISSING = object()
+
+
+class LRUCache:
+    """Keeps the maxsize most recently used entries, each for at most ttl seconds"""
+    def __init__(self, maxsize=10000, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()   # key -> (value, time stored)
+        self.lock = threading.Lock()   # Used from worker threads too
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value, or MISSING"""
+        with self.lock:
+            entry = self.entries.get(key, MISSING)
+            if entry is not MISSING:
+                value, stored = entry
+                if self.ttl is None or time.monotonic() - stored <= self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]  # Expired
+            self.misses += 1
+            return MISSING
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class SpellCache:
+    """
+    Cached word_exists() and suggest() in front of a lookup and a suggest function.
+    Has the same methods as a dictionary and an engine, so it can stand in for either.
+    """
+    def __init__(self, lookup, suggest, dictionary=None, maxsize=10000, ttl=None):
+        self.lookup = lookup
+        self.suggest_function = suggest
+        self.dictionary = dictionary
+        self.version = self._dictionary_version()
+        self.verdicts = LRUCache(maxsize, ttl)
+        self.suggestions = LRUCache(maxsize, ttl)
+
+    def _dictionary_version(self):
+        return self.dictionary.version if self.dictionary is not None else 0
+
+    def _check_version(self):
+        """Helper: drop everything if the dictionary changed since we cached it"""
+        version = self._dictionary_version()
+        if version != self.version:
+            self.version = version
+            self.invalidate()
+
+    def invalidate(self):
+        """Forget all answers (call after changing the dictionary)"""
+        self.verdicts.clear()
+        self.suggestions.clear()
+
+    def word_exists(self, word):
+        self._check_version()
+        key = word.strip().lower()
+        verdict = self.verdicts.get(key)
+        if verdict is MISSING:
+            verdict = self.lookup(key)
+            self.verdicts.put(key, verdict)
+        return verdict
+
+    def suggest(self, word, max_distance=2, limit=10):
+        self._check_version()
+        key = (word.strip().lower(), max_distance, limit)
+        result = self.suggestions.get(key)
+        if result is MISSING:
+            result = self.suggest_function(key[0], max_distance, limit)
+            self.suggestions.put(key, result)
+        return list(result)
+
+    def stats(self):
+        return {"lookup": self.verdicts.stats(), "suggest": self.suggestions.stats()}
@@ -0,0 +1,326 @@
+"""
+Compact, read-only trie stored in flat arrays
+File: compact_trie.py
+
+Every TrieNode is a Python object with its own dict, and Trie keeps a
+second copy of every word in all_words. That costs hundreds of bytes per
+node. CompactTrie freezes an existing Trie into a few flat arrays of
+4-byte integers instead:
+
+    labels[i]       letter on the edge into node i (as a code point)
+    first_child[i]  index of node i's first child; its children run up to
+                    first_child[i + 1] (nodes are numbered breadth-first,
+                    so siblings sit next to each other, sorted by letter)
+    frequency[i]    how common the word ending at node i is (0 = not a word)
+    best[i]         highest frequency anywhere below node i
+
+It supports the same word_exists, find_suggestions, fuzzy_search and
+find_sound_alikes calls as Trie, but no new words can be added. The arrays can also be memoryviews
+over a compiled dictionary file (see dictionary_file.py).
+
+Usage:
+    python compact_trie.py words.txt    # prints the memory report
+"""
+
+import bisect
+import heapq
+import sys
+from array import array
+
+from dictionary import TOP_K, CompletionCursor, Trie, calculate_difference
+from phonetic import PhoneticIndex
+
+# Largest value that fits in one array slot
+MAX_VALUE = 2 ** 32 - 1
+
+
+def estimate_trie_memory(trie):
+    """Rough size in bytes of a Trie: its nodes, their dicts and lists, and all_words"""
+    seen = set()
+
+    def size(obj):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    total = size(trie.all_words)
+    for word in trie.all_words:
+        total += size(word)
+
+    to_visit = [trie.root]
+    while to_visit:
+        node = to_visit.pop()
+        total += size(node) + size(node.__dict__) + size(node.children) + size(node.top_words)
+        for entry in node.top_words:
+            total += size(entry)
+        for letter, child in node.children.items():
+            total += size(letter)
+            to_visit.append(child)
+
+    return total
+
+
+class CompactTrie:
+    """A frozen trie packed into flat integer arrays"""
+    def __init__(self, labels, first_child, frequency, best, word_count=None):
+        self.labels = labels
+        self.first_child = first_child
+        self.frequency = frequency
+        self.best = best
+        self.node_count = len(labels)
+        if word_count is None:
+            word_count = sum(1 for f in frequency if f)
+        self.word_count = word_count
+        self.deletion_index = None  # Optional, see dictionary_file.py
+        self.phonetic_index = None  # Built by find_sound_alikes when first needed
+        self.version = 0  # Frozen, so this never changes
+        self.build_report = None
+
+    @classmethod
+    def from_trie(cls, trie):
+        """Freeze a Trie, numbering its nodes breadth-first"""
+        nodes = [trie.root]
+        labels = array('I', [0])
+        first_child = array('I')
+        frequency = array('I')
+
+        i = 0
+        while i < len(nodes):
+            node = nodes[i]
+            first_child.append(len(nodes))
+            # 0 means "not a word", so words counted 0 (e.g. "foo 0" in a list) are stored as 1
+            frequency.append(max(1, min(node.frequency, MAX_VALUE)) if node.is_word else 0)
+            for letter in sorted(node.children):
+                nodes.append(node.children[letter])
+                labels.append(ord(letter))
+            i += 1
+        first_child.append(len(nodes))  # End marker for the last node
+
+        # Children always come after their parent, so fill best from the back
+        best = array('I', frequency)
+        for i in range(len(nodes) - 1, -1, -1):
+            for child in range(first_child[i], first_child[i + 1]):
+                if best[child] > best[i]:
+                    best[i] = best[child]
+
+        compact = cls(labels, first_child, frequency, best)
+        compact.build_report = compact.memory_report(estimate_trie_memory(trie))
+        return compact
+
+    def memory_report(self, trie_bytes=None):
+        """Sizes of the arrays, compared with the original Trie when given"""
+        compact_bytes = sum(
+            len(buffer) * buffer.itemsize
+            for buffer in (self.labels, self.first_child, self.frequency, self.best)
+        )
+        report = {
+            "words": self.word_count,
+            "nodes": self.node_count,
+            "compact_bytes": compact_bytes,
+        }
+        if trie_bytes is not None:
+            report["trie_bytes"] = trie_bytes
+            report["saved_bytes"] = trie_bytes - compact_bytes
+            report["ratio"] = round(trie_bytes / compact_bytes, 1) if compact_bytes else 0
+        return report
+
+    # --------- Lookups ---------
+    def _child(self, node, letter):
+        """Helper: index of node's child for letter, or -1"""
+        code = ord(letter)
+        start = self.first_child[node]
+        end = self.first_child[node + 1]
+        i = bisect.bisect_left(self.labels, code, start, end)
+        if i < end and self.labels[i] == code:
+            return i
+        return -1
+
+    def _find_node(self, prefix):
+        """Helper: node reached by following prefix from the root, or -1"""
+        node = 0
+        for letter in prefix:
+            node = self._child(node, letter)
+            if node < 0:
+                return -1
+        return node
+
+    def word_exists(self, word):
+        """Check if a word is in the dictionary"""
+        node = self._find_node(word.lower())
+        return node >= 0 and self.frequency[node] > 0
+
+    def word_frequency(self, word):
+        """How common a word is (0 if it's not in the dictionary)"""
+        node = self._find_node(word.lower())
+        return self.frequency[node] if node >= 0 else 0
+
+    def unknown(self, words):
+        """Return the set of (lower-case) words that are not in the dictionary (see Trie.unknown)"""
+        missing = set()
+        path = [0]  # Nodes along the previous word
+        previous = ""
+
+        for word in sorted({w.lower() for w in words}):
+            shared = 0
+            limit = min(len(word), len(previous), len(path) - 1)
+            while shared < limit and word[shared] == previous[shared]:
+                shared += 1
+            del path[shared + 1:]
+
+            node = path[-1]
+            for letter in word[shared:]:
+                node = self._child(node, letter)
+                if node < 0:
+                    break
+                path.append(node)
+
+            if node < 0 or not self.frequency[node]:
+                missing.add(word)
+            previous = word
+
+        return missing
+
+    def find_suggestions(self, prefix, limit=TOP_K):
+        """
+        Find the most common words that start with prefix.
+        Best-first search: each branch is keyed by the best frequency below
+        it, so only the branches that can still win are opened.
+        """
+        prefix = prefix.lower()
+        node = self._find_node(prefix)
+        if node < 0:
+            return []
+        return self.node_completions(node, prefix, limit)
+
+    def cursor(self, limit=TOP_K):
+        """A CompletionCursor for completing text as it is typed"""
+        return CompletionCursor(self, limit)
+
+    # Node steps used by CompletionCursor (None = no such prefix)
+    def root_node(self):
+        return 0
+
+    def child_node(self, node, letter):
+        child = self._child(node, letter)
+        return child if child >= 0 else None
+
+    def node_completions(self, node, prefix, limit=TOP_K):
+        """Best-first search below node, whose text is prefix"""
+        suggestions = []
+        # (-frequency, text, is_branch, node): a word is popped before its own branch
+        heap = [(-self.best[node], prefix, 1, node)]
+        while heap and len(suggestions) < limit:
+            score, text, is_branch, node = heapq.heappop(heap)
+            if not is_branch:
+                suggestions.append(text)
+                continue
+
+            if self.frequency[node]:
+                heapq.heappush(heap, (-self.frequency[node], text, 0, node))
+            for child in range(self.first_child[node], self.first_child[node + 1]):
+                heapq.heappush(heap, (-self.best[child], text + chr(self.labels[child]), 1, child))
+
+        return suggestions
+
+    def fuzzy_search(self, word, max_distance):
+        """
+        Find all words at most max_distance changes away from word.
+        Returns a sorted list of (distance, word) pairs.
+        """
+        word = word.lower()
+        results = []
+        first_row = list(range(len(word) + 1))
+
+        for child in range(self.first_child[0], self.first_child[1]):
+            letter = chr(self.labels[child])
+            self._fuzzy_walk(child, letter, first_row, word, max_distance, results)
+
+        results.sort()
+        return results
+
+    def _fuzzy_walk(self, node, current_word, previous_row, word, max_distance, results):
+        """Helper: Extend the DP table by one row for each node we visit"""
+        letter = current_word[-1]
+        row = [previous_row[0] + 1]
+        for j in range(1, len(word) + 1):
+            if word[j - 1] == letter:
+                row.append(previous_row[j - 1])  # Letters match
+            else:
+                row.append(1 + min(
+                    previous_row[j],      # Delete
+                    row[j - 1],           # Insert
+                    previous_row[j - 1]   # Replace
+                ))
+
+        if self.frequency[node] and row[-1] <= max_distance:
+            results.append((row[-1], current_word))
+
+        # Skip this whole branch if no cell can get back under the limit
+        if min(row) > max_distance:
+            return
+
+        for child in range(self.first_child[node], self.first_child[node + 1]):
+            next_word = current_word + chr(self.labels[child])
+            self._fuzzy_walk(child, next_word, row, word, max_distance, results)
+
+    def find_similar(self, word, max_distance):
+        """
+        Find words at most max_distance changes away, as sorted (distance, word) pairs.
+        Uses the deletion index when there is one that can answer.
+        """
+        index = self.deletion_index
+        if index is not None and index.can_answer(max_distance):
+            return index.lookup(word.lower(), max_distance)
+        return self.fuzzy_search(word, max_distance)
+
+    def enable_phonetic_index(self):
+        """Index every word by its Metaphone key (see phonetic.py)"""
+        if self.phonetic_index is None:
+            self.phonetic_index = PhoneticIndex(self.words())
+        return self.phonetic_index
+
+    def find_sound_alikes(self, word, limit=10, max_distance=None):
+        """Words that sound like word, as (distance, word) pairs, closest first (see Trie)"""
+        word = word.lower()
+        ranked = []
+        for w in self.enable_phonetic_index().lookup(word):
+            if w == word:
+                continue
+            distance = calculate_difference(word, w)
+            if max_distance is None or distance <= max_distance:
+                ranked.append((distance, -self.word_frequency(w), w))
+        ranked.sort()
+        return [(distance, w) for distance, _, w in ranked[:limit]]
+
+    def word_nodes(self):
+        """Yield (node, word) for every word in the dictionary"""
+        to_visit = [(0, "")]
+        while to_visit:
+            node, text = to_visit.pop()
+            if self.frequency[node]:
+                yield node, text
+            for child in range(self.first_child[node], self.first_child[node + 1]):
+                to_visit.append((child, text + chr(self.labels[child])))
+
+    def words(self):
+        """Yield every word in the dictionary"""
+        for _, text in self.word_nodes():
+            yield text
+
+    @property
+    def all_words(self):
+        """All words as a list (built on demand, not stored)"""
+        return list(self.words())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python compact_trie.py words.txt")
+        sys.exit(1)
+
+    trie = Trie()
+    trie.load_word_list(sys.argv[1])
+    compact = CompactTrie.from_trie(trie)
+    for key, value in compact.build_report.items():
+        print(f"{key:>14}: {value}")
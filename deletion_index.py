@@ -0,0 +1,103 @@
+"""
+Deletion index for fast suggestions (SymSpell style)
+File: deletion_index.py
+
+Every dictionary word is stored under all the strings you get by deleting
+up to max_distance of its letters. To correct a misspelling we generate its
+own deletions and only check the words stored under them, so the cost
+depends on the length of the misspelling instead of the dictionary size.
+
+The index can grow large, so it takes two optional limits:
+- max_entries:       most (variant -> word) links to store (rough memory cap)
+- max_build_seconds: most time to spend building from a word list
+When a limit is hit the index stops growing and marks itself incomplete.
+Callers should then fall back to Trie.fuzzy_search().
+"""
+
+import time
+
+from distance import bounded_distance
+
+
+def generate_deletes(word, max_distance):
+    """All strings made by deleting up to max_distance letters (word included)"""
+    found = {word}
+    current = {word}
+
+    for _ in range(max_distance):
+        next_level = set()
+        for variant in current:
+            for i in range(len(variant)):
+                shorter = variant[:i] + variant[i + 1:]
+                if shorter not in found:
+                    next_level.add(shorter)
+        found.update(next_level)
+        current = next_level
+
+    return found
+
+
+class DeletionIndex:
+    """Maps deletion variants to the dictionary words they came from"""
+    def __init__(self, max_distance=2, max_entries=None, max_build_seconds=None):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.max_build_seconds = max_build_seconds
+
+        self.deletes = {}      # variant -> list of words
+        self.words = set()     # Words already indexed
+        self.entry_count = 0   # Number of (variant -> word) links
+        self.complete = True   # False once a limit stopped the index
+
+    def build(self, words):
+        """Index a list of words, stopping if the time limit runs out"""
+        start = time.perf_counter()
+
+        for word in words:
+            if not self.complete:
+                break
+            self.add_word(word)
+
+            if self.max_build_seconds is not None:
+                if time.perf_counter() - start > self.max_build_seconds:
+                    self.complete = False
+
+    def add_word(self, word):
+        """Add one word and all of its deletion variants"""
+        if not self.complete or word in self.words:
+            return
+
+        variants = generate_deletes(word, self.max_distance)
+        if self.max_entries is not None and self.entry_count + len(variants) > self.max_entries:
+            self.complete = False
+            return
+
+        for variant in variants:
+            self.deletes.setdefault(variant, []).append(word)
+        self.words.add(word)
+        self.entry_count += len(variants)
+
+    def can_answer(self, max_distance):
+        """Can lookup() give the full answer for this distance?"""
+        return self.complete and max_distance <= self.max_distance
+
+    def lookup(self, word, max_distance):
+        """
+        Find all indexed words at most max_distance changes away.
+        Returns a sorted list of (distance, word) pairs.
+        """
+        checked = set()
+        results = []
+
+        for variant in generate_deletes(word, max_distance):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+
+                difference = bounded_distance(word, candidate, max_distance)
+                if difference <= max_distance:
+                    results.append((difference, candidate))
+
+        results.sort()
+        return results
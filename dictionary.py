@@ -0,0 +1,416 @@
+"""
+Dictionary data structures
+File: dictionary.py
+
+The Trie and the edit distance reference live here, with no GUI code,
+so command-line tools and servers can import them without tkinter.
+"""
+
+import bisect
+
+from deletion_index import DeletionIndex
+from phonetic import PhoneticIndex
+
+# ==========================================
+# PART 1: Simple Data Structures
+# ==========================================
+
+# How many completions each node remembers
+TOP_K = 10
+
+class TrieNode:
+    """A single node in our Trie tree"""
+    def __init__(self):
+        self.children = {}  # Store child letters
+        self.is_word = False  # Is this the end of a word?
+        self.frequency = 0  # How common the word ending here is
+        self.top_words = []  # Best completions below here: (-frequency, word)
+
+class Trie:
+    """A tree structure to store words efficiently"""
+    def __init__(self):
+        self.root = TrieNode()
+        self.all_words = []  # Keep all words in a list too
+        self.deletion_index = None  # Optional fast suggestion index
+        self.phonetic_index = None  # Optional sound-alike index, see phonetic.py
+        self.version = 0  # Goes up whenever the dictionary changes
+        self.node_count = 1  # Nodes in the trie, counting the root
+    
+    def add_word(self, word, frequency=1):
+        """Add a word to our dictionary (adding it again makes it more common)"""
+        word = word.lower()
+        node = self.root
+        path = [node]
+        
+        # Go through each letter
+        for letter in word:
+            if letter not in node.children:
+                node.children[letter] = TrieNode()
+                self.node_count += 1
+            node = node.children[letter]
+            path.append(node)
+        
+        if not node.is_word:
+            node.is_word = True
+            self.all_words.append(word)  # Only once, even if the word is added again
+            if self.phonetic_index is not None:
+                self.phonetic_index.add_word(word)
+        node.frequency += frequency
+        self.version += 1
+        
+        # Every node on the way down may now have a new best completion
+        entry = (-node.frequency, word)
+        for step in path:
+            self._update_top_words(step, entry)
+        
+        # Keep the suggestion index up to date
+        if self.deletion_index is not None:
+            self.deletion_index.add_word(word)
+    
+    @property
+    def word_count(self):
+        """How many different words have been added"""
+        return len(self.all_words)
+    
+    def load_word_list(self, path):
+        """Add words from a text file: one word per line, optionally followed by a count"""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                frequency = int(parts[1]) if len(parts) > 1 else 1
+                self.add_word(parts[0], frequency)
+    
+    def word_exists(self, word):
+        """Check if a word is in our dictionary"""
+        word = word.lower()
+        node = self.root
+        
+        # Try to find each letter
+        for letter in word:
+            if letter not in node.children:
+                return False
+            node = node.children[letter]
+        
+        return node.is_word
+    
+    def word_frequency(self, word):
+        """How common a word is (0 if it's not in the dictionary)"""
+        node = self.root
+        for letter in word.lower():
+            node = node.children.get(letter)
+            if node is None:
+                return 0
+        return node.frequency
+    
+    def unknown(self, words):
+        """
+        Return the set of (lower-case) words that are not in the dictionary.
+        Words are looked up in sorted order, so a prefix shared with the
+        previous word is not walked again.
+        """
+        missing = set()
+        path = [self.root]  # Nodes along the previous word
+        previous = ""
+        
+        for word in sorted({w.lower() for w in words}):
+            # Reuse the nodes for the letters shared with the previous word
+            shared = 0
+            limit = min(len(word), len(previous), len(path) - 1)
+            while shared < limit and word[shared] == previous[shared]:
+                shared += 1
+            del path[shared + 1:]
+            
+            node = path[-1]
+            for letter in word[shared:]:
+                node = node.children.get(letter)
+                if node is None:
+                    break
+                path.append(node)
+            
+            if node is None or not node.is_word:
+                missing.add(word)
+            previous = word
+        
+        return missing
+    
+    def _update_top_words(self, node, entry):
+        """Helper: Put (-frequency, word) into a node's best completions"""
+        word = entry[1]
+        top = [item for item in node.top_words if item[1] != word]
+        
+        if len(top) < TOP_K or entry < top[-1]:
+            bisect.insort(top, entry)
+            del top[TOP_K:]
+        node.top_words = top
+    
+    def find_suggestions(self, prefix, limit=TOP_K):
+        """Find the most common words that start with prefix (at most TOP_K)"""
+        prefix = prefix.lower()
+        node = self.root
+        
+        # Navigate to the prefix
+        for letter in prefix:
+            if letter not in node.children:
+                return []
+            node = node.children[letter]
+        
+        # The best completions are already stored on the node
+        return [word for _, word in node.top_words[:limit]]
+    
+    def cursor(self, limit=TOP_K):
+        """A CompletionCursor for completing text as it is typed"""
+        return CompletionCursor(self, limit)
+    
+    # Node steps used by CompletionCursor (None = no such prefix)
+    def root_node(self):
+        return self.root
+    
+    def child_node(self, node, letter):
+        return node.children.get(letter)
+    
+    def node_completions(self, node, prefix, limit=TOP_K):
+        return [word for _, word in node.top_words[:limit]]
+    
+    def fuzzy_search(self, word, max_distance):
+        """
+        Find all words at most max_distance changes away from word.
+        Returns a sorted list of (distance, word) pairs.
+        """
+        word = word.lower()
+        results = []
+        
+        # First DP row: turning "" into each prefix of word
+        first_row = list(range(len(word) + 1))
+        
+        for letter, child in self.root.children.items():
+            self._fuzzy_walk(child, letter, letter, first_row, word, max_distance, results)
+        
+        results.sort()
+        return results
+    
+    def _fuzzy_walk(self, node, letter, current_word, previous_row, word, max_distance, results):
+        """Helper: Extend the DP table by one row for each node we visit"""
+        row = [previous_row[0] + 1]
+        for j in range(1, len(word) + 1):
+            if word[j - 1] == letter:
+                row.append(previous_row[j - 1])  # Letters match
+            else:
+                row.append(1 + min(
+                    previous_row[j],      # Delete
+                    row[j - 1],           # Insert
+                    previous_row[j - 1]   # Replace
+                ))
+        
+        if node.is_word and row[-1] <= max_distance:
+            results.append((row[-1], current_word))
+        
+        # Skip this whole branch if no cell can get back under the limit
+        if min(row) > max_distance:
+            return
+        
+        for next_letter, child in node.children.items():
+            self._fuzzy_walk(child, next_letter, current_word + next_letter, row, word, max_distance, results)
+    
+    def enable_deletion_index(self, max_distance=2, max_entries=None, max_build_seconds=None):
+        """
+        Build a deletion index over all words for fast suggestions.
+        max_entries and max_build_seconds limit its memory and build time.
+        """
+        self.deletion_index = DeletionIndex(max_distance, max_entries, max_build_seconds)
+        self.deletion_index.build(self.all_words)
+        return self.deletion_index
+    
+    def find_similar(self, word, max_distance):
+        """
+        Find words at most max_distance changes away, as sorted (distance, word) pairs.
+        Uses the deletion index when it can answer, otherwise walks the trie.
+        """
+        index = self.deletion_index
+        if index is not None and index.can_answer(max_distance):
+            return index.lookup(word.lower(), max_distance)
+        return self.fuzzy_search(word, max_distance)
+    
+    def enable_phonetic_index(self):
+        """
+        Index every word by its Metaphone key (see phonetic.py), kept up to
+        date by add_word. Built the first time sound-alikes are asked for.
+        """
+        if self.phonetic_index is None:
+            self.phonetic_index = PhoneticIndex(self.all_words)
+        return self.phonetic_index
+    
+    def find_sound_alikes(self, word, limit=10, max_distance=None):
+        """
+        Words that sound like word (same Metaphone key, see phonetic.py),
+        at most max_distance changes away (None = any), as (distance, word)
+        pairs, closest first (and most common first among equally close ones).
+        limit=None returns all of them.
+        """
+        word = word.lower()
+        ranked = []
+        for w in self.enable_phonetic_index().lookup(word):
+            if w == word:
+                continue
+            distance = calculate_difference(word, w)
+            if max_distance is None or distance <= max_distance:
+                ranked.append((distance, -self.word_frequency(w), w))
+        ranked.sort()
+        return [(distance, w) for distance, _, w in ranked[:limit]]
+
+
+class CompletionCursor:
+    """
+    Completions for text that is typed one letter at a time.
+    Keeps the trie node for every prefix of the text, so typing a letter
+    is one step down (push) and backspace is one step back (pop), and
+    remembers the completions for each prefix, so going back costs nothing.
+    Works with any dictionary that has root_node, child_node and
+    node_completions (Trie, CompactTrie).
+    """
+    def __init__(self, dictionary, limit=TOP_K):
+        self.dictionary = dictionary
+        self.limit = limit
+        self.version = dictionary.version
+        self.letters = []                      # The text, lower-cased
+        self.nodes = [dictionary.root_node()]  # nodes[i]: node for the first i letters, or None
+        self.results = [None]                  # results[i]: completions for the first i letters
+    
+    @property
+    def prefix(self):
+        return "".join(self.letters)
+    
+    def push(self, letter):
+        """Append one letter"""
+        letter = letter.lower()
+        node = self.nodes[-1]
+        if node is not None:
+            node = self.dictionary.child_node(node, letter)
+        self.letters.append(letter)
+        self.nodes.append(node)
+        self.results.append(None)
+    
+    def pop(self):
+        """Remove the last letter (like backspace)"""
+        if self.letters:
+            self.letters.pop()
+            self.nodes.pop()
+            self.results.pop()
+    
+    def set_text(self, text):
+        """Move to text, keeping everything for the part it shares with the current text"""
+        text = text.lower()
+        shared = 0
+        while shared < len(self.letters) and shared < len(text) and self.letters[shared] == text[shared]:
+            shared += 1
+        while len(self.letters) > shared:
+            self.pop()
+        for letter in text[shared:]:
+            self.push(letter)
+    
+    def completions(self):
+        """The most common words starting with the text (at most limit)"""
+        if self.version != self.dictionary.version:
+            # Words were added: walk the text again and forget old answers
+            self.version = self.dictionary.version
+            text = self.prefix
+            self.letters = []
+            self.nodes = [self.dictionary.root_node()]
+            self.results = [None]
+            self.set_text(text)
+        
+        depth = len(self.letters)
+        if self.results[depth] is None:
+            self.results[depth] = self._find_completions(depth)
+        return self.results[depth]
+    
+    def _find_completions(self, depth):
+        """Helper: completions for the first depth letters"""
+        node = self.nodes[depth]
+        if node is None:
+            return []
+        
+        # If the previous prefix's completions already hold limit words that
+        # continue with this letter, they are exactly the best ones here
+        if depth > 0 and self.results[depth - 1] is not None:
+            letter = self.letters[depth - 1]
+            reused = [w for w in self.results[depth - 1] if len(w) >= depth and w[depth - 1] == letter]
+            if len(reused) >= self.limit:
+                return reused
+        
+        return self.dictionary.node_completions(node, self.prefix, self.limit)
+
+
+def calculate_difference(word1, word2):
+    """
+    Count how many changes needed to turn word1 into word2
+    (insert, delete, or replace letters)
+
+    This is the simple full-table version, kept as the reference for
+    bounded_distance() in distance.py and Trie.fuzzy_search().
+    """
+    len1 = len(word1)
+    len2 = len(word2)
+    
+    # Create a table to store results
+    table = []
+    for i in range(len1 + 1):
+        row = []
+        for j in range(len2 + 1):
+            row.append(0)
+        table.append(row)
+    
+    # Fill first column and row
+    for i in range(len1 + 1):
+        table[i][0] = i
+    for j in range(len2 + 1):
+        table[0][j] = j
+    
+    # Fill the rest of the table
+    for i in range(1, len1 + 1):
+        for j in range(1, len2 + 1):
+            if word1[i-1] == word2[j-1]:
+                table[i][j] = table[i-1][j-1]  # Letters match
+            else:
+                table[i][j] = 1 + min(
+                    table[i-1][j],      # Delete
+                    table[i][j-1],      # Insert
+                    table[i-1][j-1]     # Replace
+                )
+    
+    return table[len1][len2]
+
+
+# Built-in word list used when no dictionary file is given
+DEFAULT_WORDS = [
+    # Programming words
+    "algorithm", "application", "binary", "code", "computer", "data",
+    "database", "debug", "function", "hardware", "internet", "java",
+    "language", "memory", "network", "program", "python", "software",
+    "system", "technology", "tree", "trie", "variable", "web",
+    
+    # Common words
+    "about", "after", "again", "all", "also", "always", "and",
+    "answer", "any", "apple", "are", "around", "ask", "back",
+    "because", "before", "being", "between", "both", "but", "call",
+    "came", "can", "change", "come", "could", "create", "day",
+    "did", "different", "do", "does", "down", "each", "even",
+    "every", "find", "first", "follow", "for", "from", "get",
+    "give", "good", "great", "had", "has", "have", "help",
+    "here", "high", "home", "how", "important", "into", "is",
+    "it", "just", "know", "large", "last", "like", "little",
+    "long", "look", "made", "make", "many", "may", "more",
+    "most", "move", "much", "name", "need", "new", "next",
+    "not", "now", "number", "of", "old", "on", "one",
+    "only", "or", "other", "our", "out", "over", "part",
+    "people", "place", "program", "put", "said", "same", "say",
+    "school", "see", "she", "should", "show", "small", "some",
+    "take", "tell", "than", "that", "the", "their", "them",
+    "then", "there", "these", "they", "thing", "think", "this",
+    "time", "to", "too", "two", "under", "up", "use",
+    "very", "want", "was", "water", "way", "we", "well",
+    "were", "what", "when", "where", "which", "who", "will",
+    "with", "word", "work", "world", "would", "write", "year",
+    "you", "your"
+]
@@ -0,0 +1,291 @@
+"""
+Compiled binary dictionary files, opened with mmap
+File: dictionary_file.py
+
+Building a Trie from a word list means parsing text and inserting words
+one at a time on every launch. Instead, compile the dictionary once:
+
+    python dictionary_file.py compile-dict words.txt words.dict --index-distance 2
+    python dictionary_file.py check-dict words.txt words.dict   # compare with the word list
+
+and open it at runtime with open_dictionary("words.dict"). The file is
+mapped into memory and queried in place, so nothing is parsed or copied
+at startup and several processes share the same pages.
+
+File layout (all numbers are 4-byte unsigned ints in the machine's byte order):
+
+    header      magic, version, byte order, counts (see HEADER)
+    labels      node_count          CompactTrie arrays, see compact_trie.py
+    first_child node_count + 1
+    frequency   node_count
+    best        node_count
+    parent      node_count          parent of each node, to rebuild words
+    key_offsets variant_count + 1   deletion index: where each variant starts
+    key_bytes   (padded to 4)       all variants, UTF-8, sorted
+    post_offsets variant_count + 1  where each variant's words start
+    postings    posting_count       node numbers of the words
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+import time
+import weakref
+from array import array
+
+from compact_trie import CompactTrie
+from deletion_index import generate_deletes
+from distance import bounded_distance
+from dictionary import Trie
+from engines import ENGINES, create_engine
+
+MAGIC = b"SPELLDIC"
+VERSION = 1
+
+# magic, version, little endian?, node_count, word_count,
+# index_distance, variant_count, posting_count, key_byte_count
+HEADER = struct.Struct("<8sIIIIIIII")
+
+
+class MappedDeletionIndex:
+    """Read-only deletion index stored inside a compiled dictionary file"""
+    def __init__(self, dictionary, max_distance, key_offsets, key_bytes, post_offsets, postings, parent):
+        # The dictionary holds this index; a proxy back avoids a reference cycle,
+        # so a dropped dictionary is freed at once, not when the garbage collector runs
+        self.dictionary = weakref.proxy(dictionary)
+        self.max_distance = max_distance
+        self.key_offsets = key_offsets
+        self.key_bytes = key_bytes
+        self.post_offsets = post_offsets
+        self.postings = postings
+        self.parent = parent
+        self.variant_count = len(key_offsets) - 1
+        self.complete = True
+
+    def can_answer(self, max_distance):
+        """Can lookup() give the full answer for this distance?"""
+        return max_distance <= self.max_distance
+
+    def _key(self, i):
+        """Helper: variant number i as bytes"""
+        return self.key_bytes[self.key_offsets[i]:self.key_offsets[i + 1]]
+
+    def _find_variant(self, variant):
+        """Helper: binary search for a variant, returns its number or -1"""
+        target = variant.encode('utf-8')
+        low, high = 0, self.variant_count
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(self._key(middle)) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.variant_count and bytes(self._key(low)) == target:
+            return low
+        return -1
+
+    def _word_at(self, node):
+        """Helper: rebuild the word ending at a node by walking up to the root"""
+        letters = []
+        labels = self.dictionary.labels
+        while node:
+            letters.append(chr(labels[node]))
+            node = self.parent[node]
+        return "".join(reversed(letters))
+
+    def lookup(self, word, max_distance):
+        """
+        Find all indexed words at most max_distance changes away.
+        Returns a sorted list of (distance, word) pairs.
+        """
+        checked = set()
+        results = []
+
+        for variant in generate_deletes(word, max_distance):
+            i = self._find_variant(variant)
+            if i < 0:
+                continue
+            for p in range(self.post_offsets[i], self.post_offsets[i + 1]):
+                node = self.postings[p]
+                if node in checked:
+                    continue
+                checked.add(node)
+
+                candidate = self._word_at(node)
+                difference = bounded_distance(word, candidate, max_distance)
+                if difference <= max_distance:
+                    results.append((difference, candidate))
+
+        results.sort()
+        return results
+
+
+def _padded(data):
+    """Helper: pad bytes to a multiple of 4 so the next array stays aligned"""
+    return data + b"\0" * (-len(data) % 4)
+
+
+def compile_dictionary(trie, path, index_distance=0):
+    """Write a Trie (and optionally a deletion index) to a binary dictionary file"""
+    compact = CompactTrie.from_trie(trie)
+
+    parent = array('I', [0]) * compact.node_count
+    for node in range(compact.node_count):
+        for child in range(compact.first_child[node], compact.first_child[node + 1]):
+            parent[child] = node
+
+    # Deletion index: variant -> node numbers of the words it came from
+    variants = {}
+    if index_distance:
+        for node, word in compact.word_nodes():
+            for variant in generate_deletes(word, index_distance):
+                variants.setdefault(variant, []).append(node)
+
+    key_offsets = array('I', [0])
+    key_bytes = bytearray()
+    post_offsets = array('I', [0])
+    postings = array('I')
+    for key in sorted(variants, key=lambda v: v.encode('utf-8')):
+        key_bytes += key.encode('utf-8')
+        key_offsets.append(len(key_bytes))
+        postings.extend(sorted(variants[key]))
+        post_offsets.append(len(postings))
+
+    header = HEADER.pack(
+        MAGIC, VERSION, sys.byteorder == "little",
+        compact.node_count, compact.word_count,
+        index_distance, len(variants), len(postings), len(key_bytes),
+    )
+    with open(path, 'wb') as f:
+        f.write(header)
+        for buffer in (compact.labels, compact.first_child, compact.frequency, compact.best, parent, key_offsets):
+            f.write(buffer.tobytes())
+        f.write(_padded(bytes(key_bytes)))
+        f.write(post_offsets.tobytes())
+        f.write(postings.tobytes())
+
+    return compact.build_report
+
+
+def open_dictionary(path):
+    """Map a compiled dictionary file and return a CompactTrie that reads it in place"""
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (magic, version, little_endian, node_count, word_count,
+     index_distance, variant_count, posting_count, key_byte_count) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a compiled dictionary file")
+    if version != VERSION:
+        raise ValueError(f"{path} has version {version}, expected {VERSION} (recompile it)")
+    if bool(little_endian) != (sys.byteorder == "little"):
+        raise ValueError(f"{path} was compiled on a machine with a different byte order")
+
+    view = memoryview(data)
+    offset = HEADER.size  # 40 bytes, so the arrays after it stay aligned
+
+    def take_ints(count):
+        nonlocal offset
+        ints = view[offset:offset + count * 4].cast('I')
+        offset += count * 4
+        return ints
+
+    labels = take_ints(node_count)
+    first_child = take_ints(node_count + 1)
+    frequency = take_ints(node_count)
+    best = take_ints(node_count)
+    parent = take_ints(node_count)
+    key_offsets = take_ints(variant_count + 1)
+    key_bytes = view[offset:offset + key_byte_count]
+    offset += key_byte_count + (-key_byte_count % 4)
+    post_offsets = take_ints(variant_count + 1)
+    postings = take_ints(posting_count)
+
+    dictionary = CompactTrie(labels, first_child, frequency, best, word_count)
+    if index_distance:
+        dictionary.deletion_index = MappedDeletionIndex(
+            dictionary, index_distance, key_offsets, key_bytes, post_offsets, postings, parent
+        )
+    dictionary.mapping = data  # Keep the file mapped while the dictionary is used
+    return dictionary
+
+
+def check_dictionary(words_path, path, max_distance=None, samples=50):
+    """
+    Compare a compiled file with the word list it came from: every word must
+    be known, and every engine must give the same suggestions as over a Trie
+    (whatever deletion index the file has, if any). max_distance defaults to
+    the distance of the file's index (2 without one). Returns a list of problems.
+    """
+    trie = Trie()
+    trie.load_word_list(words_path)
+    compiled = open_dictionary(path)
+    if max_distance is None:
+        index = compiled.deletion_index
+        max_distance = index.max_distance if index is not None else 2
+    problems = []
+
+    missing = compiled.unknown(trie.all_words)
+    if missing:
+        problems.append(f"{len(missing)} words missing, e.g. {', '.join(sorted(missing)[:5])}")
+    if compiled.find_suggestions("") != trie.find_suggestions(""):
+        problems.append("completions differ")
+
+    rng = random.Random(0)
+    words = rng.sample(trie.all_words, min(samples, len(trie.all_words)))
+    queries = [w[1:] + rng.choice("aeiost") for w in words]
+    for name in ENGINES:
+        options = {"max_distance": max_distance} if name == "deletes" else {}
+        try:
+            engine = create_engine(name, compiled, **options)
+        except Exception as e:
+            problems.append(f"engine {name} failed: {e!r}")
+            continue
+        reference = create_engine(name, trie, **options)
+        for query in queries:
+            if engine.suggest(query, max_distance, 10) != reference.suggest(query, max_distance, 10):
+                problems.append(f"engine {name} differs for '{query}'")
+                break
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile word lists into binary dictionary files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile-dict", help="compile a word list")
+    compile_parser.add_argument("words", help="text file: one word per line, optionally followed by a count")
+    compile_parser.add_argument("output", help="where to write the compiled dictionary")
+    compile_parser.add_argument("--index-distance", type=int, default=0,
+                                help="also store a deletion index up to this distance (default: none)")
+
+    check_parser = commands.add_parser("check-dict", help="compare a compiled dictionary with its word list")
+    check_parser.add_argument("words", help="the word list the dictionary was compiled from")
+    check_parser.add_argument("dictionary", help="the compiled dictionary")
+    check_parser.add_argument("--max-distance", type=int,
+                              help="distance the engines are asked for "
+                                   "(default: the file's index distance, or 2 without an index)")
+    args = parser.parse_args(argv)
+
+    if args.command == "check-dict":
+        problems = check_dictionary(args.words, args.dictionary, args.max_distance)
+        for problem in problems:
+            print(problem)
+        print("OK" if not problems else f"{len(problems)} problem(s)")
+        return 1 if problems else 0
+
+    start = time.perf_counter()
+    trie = Trie()
+    trie.load_word_list(args.words)
+    report = compile_dictionary(trie, args.output, args.index_distance)
+    elapsed = time.perf_counter() - start
+
+    print(f"Compiled {report['words']} words ({report['nodes']} nodes) "
+          f"into {args.output} in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
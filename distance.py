@@ -0,0 +1,151 @@
+"""
+Fast edit distance with a limit
+File: distance.py
+
+calculate_difference() in spell_checker.py fills the whole table for every
+pair of words. When we only care about words that are at most a few changes
+away, most of that work is wasted. The helpers here take the limit into
+account and stop as soon as the answer is known to be too big.
+
+- bounded_distance()       main entry point, picks the fastest method
+- edit_distance()          exact distance with no limit
+- bit_parallel_distance()  Myers / Hyyro bit-vector method (words up to 64 letters)
+- banded_distance()        DP that only fills a band around the diagonal
+"""
+
+from functools import lru_cache
+
+# Longest word handled by the bit-parallel method
+WORD_BITS = 64
+
+
+def bounded_distance(word1, word2, max_distance):
+    """
+    Count changes needed to turn word1 into word2, up to max_distance.
+    Returns max_distance + 1 when the words are further apart than that.
+    """
+    if word1 == word2:
+        return 0
+
+    len1 = len(word1)
+    len2 = len(word2)
+
+    # Each extra letter needs at least one insert or delete
+    if abs(len1 - len2) > max_distance:
+        return max_distance + 1
+    if len1 == 0 or len2 == 0:
+        return max(len1, len2)
+
+    if len1 <= WORD_BITS:
+        return bit_parallel_distance(word1, word2, max_distance)
+    return banded_distance(word1, word2, max_distance)
+
+
+def edit_distance(word1, word2):
+    """Exact number of changes needed to turn word1 into word2"""
+    longest = max(len(word1), len(word2))
+    return bounded_distance(word1, word2, longest)
+
+
+def banded_distance(word1, word2, max_distance):
+    """
+    Edit distance that only fills cells within max_distance of the diagonal.
+    Stops as soon as every cell in a row is over the limit.
+    """
+    len1 = len(word1)
+    len2 = len(word2)
+    too_far = max_distance + 1
+
+    if abs(len1 - len2) > max_distance:
+        return too_far
+
+    # Cells outside the band are treated as "too far"
+    previous = [j if j <= max_distance else too_far for j in range(len2 + 1)]
+
+    for i in range(1, len1 + 1):
+        current = [too_far] * (len2 + 1)
+        if i <= max_distance:
+            current[0] = i
+
+        letter = word1[i - 1]
+        first = max(1, i - max_distance)
+        last = min(len2, i + max_distance)
+        row_min = current[0]
+
+        for j in range(first, last + 1):
+            if letter == word2[j - 1]:
+                value = previous[j - 1]  # Letters match
+            else:
+                value = 1 + min(
+                    previous[j],         # Delete
+                    current[j - 1],      # Insert
+                    previous[j - 1]      # Replace
+                )
+            if value > too_far:
+                value = too_far
+            current[j] = value
+            if value < row_min:
+                row_min = value
+
+        # Nothing in this row can get back under the limit
+        if row_min > max_distance:
+            return too_far
+        previous = current
+
+    return min(previous[len2], too_far)
+
+
+@lru_cache(maxsize=256)
+def _pattern_masks(word):
+    """Helper: bit mask of the positions of each letter in word"""
+    masks = {}
+    for position, letter in enumerate(word):
+        masks[letter] = masks.get(letter, 0) | (1 << position)
+    return masks
+
+
+def bit_parallel_distance(word1, word2, max_distance=None):
+    """
+    Edit distance using one bit per letter of word1 (Myers / Hyyro).
+    A whole column of the DP table is updated with a few integer operations.
+    With max_distance set, returns max_distance + 1 once the limit can't be met.
+    """
+    len1 = len(word1)
+    len2 = len(word2)
+    if len1 == 0:
+        return len2 if max_distance is None else min(len2, max_distance + 1)
+    if len1 > WORD_BITS:
+        raise ValueError(f"bit_parallel_distance supports words up to {WORD_BITS} letters")
+
+    masks = _pattern_masks(word1)
+    all_ones = (1 << len1) - 1
+    last_bit = 1 << (len1 - 1)
+
+    plus = all_ones   # Vertical +1 differences
+    minus = 0         # Vertical -1 differences
+    score = len1
+
+    for j, letter in enumerate(word2):
+        match = masks.get(letter, 0)
+        xv = match | minus
+        xh = (((match & plus) + plus) ^ plus) | match
+        h_plus = minus | (~(xh | plus) & all_ones)
+        h_minus = plus & xh
+
+        if h_plus & last_bit:
+            score += 1
+        elif h_minus & last_bit:
+            score -= 1
+
+        # Each remaining letter of word2 can lower the score by at most one
+        if max_distance is not None and score - (len2 - j - 1) > max_distance:
+            return max_distance + 1
+
+        h_plus = ((h_plus << 1) | 1) & all_ones
+        h_minus = (h_minus << 1) & all_ones
+        plus = h_minus | (~(xv | h_plus) & all_ones)
+        minus = h_plus & xv
+
+    if max_distance is not None and score > max_distance:
+        return max_distance + 1
+    return score
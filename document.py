@@ -0,0 +1,36 @@
+"""
+Checking whole documents
+File: document.py
+
+A document repeats the same words many times. check_document() tokenizes
+the text once, reduces the tokens to the set of distinct words, looks
+them all up in one batched dictionary.unknown() call, and then maps the
+verdicts back to every occurrence. The cost grows with the number of
+distinct words instead of the number of tokens.
+"""
+
+import re
+
+# Words: letters, apostrophes, hyphens
+WORD_PATTERN = re.compile(r"[A-Za-z\u00C0-\u017F'-]+")
+
+
+def tokenize(text):
+    """Return (word, start, end) for every word, with character offsets into text"""
+    return [(m.group(0), m.start(), m.end()) for m in WORD_PATTERN.finditer(text)]
+
+
+def check_document(text, dictionary, known=(), tokens=None):
+    """
+    Return (word, start, end) for every misspelled word in text.
+    known: extra lower-case words to accept (e.g. the user's own words).
+    Single letters are never flagged.
+    """
+    if tokens is None:
+        tokens = tokenize(text)
+
+    distinct = {word.lower() for word, _, _ in tokens}
+    to_check = [word for word in distinct if len(word) > 1 and word not in known]
+    unknown = dictionary.unknown(to_check)
+
+    return [token for token in tokens if token[0].lower() in unknown]
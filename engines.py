@@ -0,0 +1,240 @@
+"""
+Pluggable suggestion engines
+File: engines.py
+
+Every engine answers the same question: "which dictionary words are close
+to this misspelling?" so the GUIs can pick one at startup and we can
+compare them on the same input.
+
+Built-in engines (see ENGINES):
+- trie      walk the Trie with one DP row per node (Trie.fuzzy_search)
+- deletes   SymSpell-style deletion index (deletion_index.py)
+- bktree    BK-tree over Trie.all_words using the triangle inequality
+- numpy     whole length buckets at a time with NumPy (vectorized.py),
+            only offered when NumPy is installed
+
+SoundAlikeEngine wraps any of them to add words that sound like the
+misspelling (phonetic.py), which are often more changes away than the
+engine looks ("fone" -> "phone").
+"""
+
+import warnings
+
+from distance import edit_distance
+from phonetic import metaphone
+from vectorized import WordBuckets, numpy_available
+
+# Sound-alikes may be this many changes further away than the engine looks
+SOUND_ALIKE_BONUS = 1
+# Places in the suggestions kept for the likeliest sound-alikes (see SoundAlikeEngine.likely_sound_alikes)
+SOUND_ALIKE_SLOTS = 2
+# Only sound-alikes whose keys with vowels are at most this many changes apart can take one
+SOUND_ALIKE_KEY_DISTANCE = 1
+
+
+class SuggestionEngine:
+    """Base class: find dictionary words close to a misspelled word"""
+    name = "base"
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+    def suggest(self, word, max_distance=2, limit=10):
+        """Return up to limit (distance, word) pairs, closest first"""
+        raise NotImplementedError
+
+    def add_word(self, word):
+        """Called after a word was added to the dictionary"""
+        pass
+
+
+class TrieEngine(SuggestionEngine):
+    """Walks the Trie directly, no extra index needed"""
+    name = "trie"
+
+    def suggest(self, word, max_distance=2, limit=10):
+        return self.dictionary.fuzzy_search(word, max_distance)[:limit]
+
+
+class DeletionIndexEngine(SuggestionEngine):
+    """Looks up deletion variants in a precomputed index"""
+    name = "deletes"
+
+    def __init__(self, dictionary, max_distance=2, max_entries=None, max_build_seconds=None):
+        super().__init__(dictionary)
+        # Reuse an index that came with the dictionary (e.g. a compiled file),
+        # otherwise build one. The Trie keeps it up to date in add_word.
+        index = dictionary.deletion_index
+        if index is None or not index.can_answer(max_distance):
+            if hasattr(dictionary, "enable_deletion_index"):
+                dictionary.enable_deletion_index(max_distance, max_entries, max_build_seconds)
+            else:
+                # A compiled dictionary can't grow an index; find_similar walks the trie instead
+                warnings.warn(f"The compiled dictionary has no deletion index for distance {max_distance} "
+                              f"(compile it with --index-distance {max_distance}); suggestions will be slower",
+                              RuntimeWarning, stacklevel=2)
+
+    def suggest(self, word, max_distance=2, limit=10):
+        return self.dictionary.find_similar(word, max_distance)[:limit]
+
+
+class BKTreeNode:
+    """A word plus its children, keyed by their distance to the word"""
+    def __init__(self, word):
+        self.word = word
+        self.children = {}
+
+
+class BKTreeEngine(SuggestionEngine):
+    """
+    BK-tree: each child sits under its edit distance to the parent word.
+    If the query is d away from a node, the triangle inequality says any
+    match within max_distance must be under a key between
+    d - max_distance and d + max_distance, so other children are skipped.
+    """
+    name = "bktree"
+
+    def __init__(self, dictionary):
+        super().__init__(dictionary)
+        self.root = None
+        self.size = 0
+        for word in dictionary.all_words:
+            self.add_word(word)
+
+    def add_word(self, word):
+        word = word.lower()
+        if self.root is None:
+            self.root = BKTreeNode(word)
+            self.size = 1
+            return
+
+        node = self.root
+        while True:
+            difference = edit_distance(word, node.word)
+            if difference == 0:
+                return  # Already in the tree
+            child = node.children.get(difference)
+            if child is None:
+                node.children[difference] = BKTreeNode(word)
+                self.size += 1
+                return
+            node = child
+
+    def suggest(self, word, max_distance=2, limit=10):
+        word = word.lower()
+        results = []
+        if self.root is None:
+            return results
+
+        to_visit = [self.root]
+        while to_visit:
+            node = to_visit.pop()
+            difference = edit_distance(word, node.word)
+            if difference <= max_distance:
+                results.append((difference, node.word))
+
+            low = difference - max_distance
+            high = difference + max_distance
+            for key, child in node.children.items():
+                if low <= key <= high:
+                    to_visit.append(child)
+
+        results.sort()
+        return results[:limit]
+
+
+class VectorizedEngine(SuggestionEngine):
+    """Compares against every word of a nearby length at once (best for bulk jobs)"""
+    name = "numpy"
+
+    def __init__(self, dictionary):
+        super().__init__(dictionary)
+        self.buckets = WordBuckets(dictionary.all_words)
+
+    def add_word(self, word):
+        self.buckets.add_word(word)
+
+    def suggest(self, word, max_distance=2, limit=10):
+        return self.buckets.search(word, max_distance)[:limit]
+
+
+class SoundAlikeEngine(SuggestionEngine):
+    """Another engine's suggestions merged with the dictionary's sound-alikes"""
+    name = "sound-alike"
+
+    def __init__(self, engine, dictionary=None):
+        # dictionary: where to find sound-alikes, if not the engine's own
+        super().__init__(engine.dictionary if dictionary is None else dictionary)
+        self.engine = engine
+        # A CompactTrie indexes its words on first use; do it now instead
+        if hasattr(self.dictionary, "enable_phonetic_index"):
+            self.dictionary.enable_phonetic_index()
+
+    def add_word(self, word):
+        self.engine.add_word(word)  # The dictionary indexes its own new words
+
+    def suggest(self, word, max_distance=2, limit=10):
+        close = self.engine.suggest(word, max_distance, limit)
+        # All of them, so the likeliest can be found however far down they are
+        sound_alikes = self.dictionary.find_sound_alikes(word, None, max_distance + SOUND_ALIKE_BONUS)
+        return merge_sound_alikes(close, sound_alikes, limit, self.likely_sound_alikes(word, sound_alikes))
+
+    def likely_sound_alikes(self, word, sound_alikes):
+        """
+        Up to SOUND_ALIKE_SLOTS sound-alikes ranked by how far apart their
+        Metaphone keys with vowels are from word's, then most common first.
+        "night" for "nite" is 3 changes away, behind plenty of 1-change words,
+        but its key NIT is one change from NITE.
+        """
+        key = metaphone(word, vowels=True)
+        likely = []
+        for _, w in sound_alikes:
+            difference = edit_distance(key, metaphone(w, vowels=True))
+            if difference <= SOUND_ALIKE_KEY_DISTANCE:
+                likely.append((difference, -self.dictionary.word_frequency(w), w))
+        likely.sort()
+        return [w for _, _, w in likely[:SOUND_ALIKE_SLOTS]]
+
+
+def merge_sound_alikes(close, sound_alikes, limit=10, keep=()):
+    """
+    One list of (distance, word) pairs from edit-distance results and sound-alikes,
+    closest first, with sound-alikes ahead of other words at the same distance.
+    The words in keep always get a place, even if closer words have to make room.
+    """
+    alike = {w for _, w in sound_alikes}
+    merged = {}
+    for distance, w in list(sound_alikes) + list(close):
+        merged.setdefault(w, distance)
+    # Stable sort: equal ranks keep their order (sound-alikes come most common first)
+    ranked = sorted(merged.items(), key=lambda item: (item[1], item[0] not in alike))
+
+    keep = set(list(keep)[:limit])
+    room = limit - len(keep)  # Places left for everything else
+    results = []
+    for w, distance in ranked:
+        if w in keep:
+            results.append((distance, w))
+        elif room > 0:
+            results.append((distance, w))
+            room -= 1
+    return results
+
+
+# Engines the GUIs can choose from at startup
+ENGINES = {
+    TrieEngine.name: TrieEngine,
+    DeletionIndexEngine.name: DeletionIndexEngine,
+    BKTreeEngine.name: BKTreeEngine,
+}
+if numpy_available():
+    ENGINES[VectorizedEngine.name] = VectorizedEngine
+
+DEFAULT_ENGINE = TrieEngine.name
+
+
+def create_engine(name, dictionary, **options):
+    """Build the engine called name over a Trie dictionary"""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown suggestion engine '{name}' (choose from {', '.join(ENGINES)})")
+    return ENGINES[name](dictionary, **options)
@@ -0,0 +1,278 @@
+"""
+Layered dictionaries
+File: layers.py
+
+Instead of one big Trie with every word list in it, a LayeredDictionary
+stacks several smaller dictionaries, highest priority first:
+
+    user      the personal words (user_words.txt), can be added to
+    medical   a domain word list, only loaded if a document needs it
+    base      the general word list
+
+Each layer has its own dictionary (a Trie, or a CompactTrie read from a
+compiled file) and its own suggestion engine. Both are built the first
+time the layer is asked something, and unload() drops them again.
+Turning a layer off (set_active) unloads it.
+
+A word is correct if any active layer knows it, so lookups may ask the
+layers in any order: first the ones already loaded, then the others from
+the lowest priority up (the general lists answer most words). They stop
+as soon as every word is known, so a document that only uses base words
+never loads the domain layers.
+Completions and suggestions are merged across the active layers that are
+already loaded (asking them never loads a layer): completions in priority
+order, suggestions (and sound-alikes) by distance and then priority. A
+misspelling has been through unknown(), which loaded every layer on the way.
+
+LayeredDictionary has the same word_exists / unknown / find_suggestions /
+find_sound_alikes methods as Trie, and LayeredEngine is a suggestion engine over it, so it
+can be used anywhere a dictionary and engine are.
+"""
+
+import threading
+
+from dictionary import TOP_K, Trie
+from dictionary_file import MAGIC, open_dictionary
+from engines import DEFAULT_ENGINE, SuggestionEngine, create_engine
+
+
+def load_path(path):
+    """Open a compiled dictionary file, or load a word list into a Trie"""
+    with open(path, 'rb') as f:
+        compiled = f.read(len(MAGIC)) == MAGIC
+    if compiled:
+        return open_dictionary(path)
+    trie = Trie()
+    trie.load_word_list(path)
+    return trie
+
+
+class DictionaryLayer:
+    """One named dictionary plus its suggestion engine, built on first use"""
+    def __init__(self, name, loader, engine=DEFAULT_ENGINE, engine_options=None, writable=False):
+        self.name = name
+        self.loader = loader                  # Function returning the dictionary
+        self.engine_name = engine
+        self.engine_options = engine_options or {}
+        self.writable = writable              # Can words be added (needs a Trie)?
+        self.active = True
+        self._dictionary = None
+        self._engine = None
+        self.lock = threading.Lock()          # Only load once, even from worker threads
+
+    @classmethod
+    def from_path(cls, name, path, **options):
+        """Layer from a word list or compiled dictionary file"""
+        return cls(name, lambda: load_path(path), **options)
+
+    @classmethod
+    def from_words(cls, name, words, **options):
+        """
+        Layer from a list of words (loaded into a Trie when first used). words
+        may be a live list that the UI thread adds to while a worker loads it.
+        """
+        def load():
+            trie = Trie()
+            for word in list(words):  # A copy, so it can't change while we go through it
+                trie.add_word(word)
+            return trie
+        return cls(name, load, **options)
+
+    @property
+    def loaded(self):
+        return self._dictionary is not None
+
+    @property
+    def dictionary(self):
+        if self._dictionary is None:
+            self.load(engine=False)
+        return self._dictionary
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self.load()
+        return self._engine
+
+    def load(self, engine=True):
+        """Load the dictionary now if it isn't yet, and build the engine too unless engine=False"""
+        with self.lock:
+            if self._dictionary is None:
+                self._dictionary = self.loader()
+            if engine and self._engine is None:
+                self._engine = create_engine(self.engine_name, self._dictionary, **self.engine_options)
+
+    @property
+    def version(self):
+        """The dictionary's version, or -1 while not loaded"""
+        return self._dictionary.version if self._dictionary is not None else -1
+
+    def add_word(self, word, frequency=1):
+        if not self.writable:
+            raise ValueError(f"Layer '{self.name}' is read-only")
+        loaded = self.loaded
+        dictionary = self.dictionary
+        if not loaded and dictionary.word_exists(word):
+            return  # Just loaded from a live word list that already had it
+        dictionary.add_word(word, frequency)
+        if self._engine is not None:
+            self._engine.add_word(word.lower())
+
+    def unload(self):
+        """Forget the dictionary and engine (they are loaded again when needed)"""
+        with self.lock:
+            self._dictionary = None
+            self._engine = None
+
+
+class LayeredDictionary:
+    """Several DictionaryLayers, looked up in priority order (first = highest)"""
+    def __init__(self, layers=()):
+        self.layers = list(layers)
+        self.changes = 0  # Goes up when layers are added, removed or turned on/off
+
+    def add_layer(self, layer, position=None):
+        """Add a layer (at the end, i.e. lowest priority, unless position is given)"""
+        if self.get_layer(layer.name) is not None:
+            raise ValueError(f"There is already a layer called '{layer.name}'")
+        self.layers.insert(len(self.layers) if position is None else position, layer)
+        self.changes += 1
+
+    def remove_layer(self, name):
+        layer = self.get_layer(name)
+        if layer is not None:
+            self.layers.remove(layer)
+            layer.unload()
+            self.changes += 1
+
+    def get_layer(self, name):
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        return None
+
+    def set_active(self, name, active):
+        """Turn a layer on or off; turning it off also unloads it"""
+        layer = self.get_layer(name)
+        if layer is None:
+            raise ValueError(f"No layer called '{name}'")
+        if layer.active != active:
+            layer.active = active
+            if not active:
+                layer.unload()
+            self.changes += 1
+
+    def active_layers(self):
+        return [layer for layer in self.layers if layer.active]
+
+    def loaded_layers(self):
+        """Active layers that are loaded, in priority order"""
+        return [layer for layer in self.layers if layer.active and layer.loaded]
+
+    def lookup_order(self):
+        """Active layers, loaded ones first, then the rest from the lowest priority up"""
+        active = self.active_layers()
+        return [l for l in active if l.loaded] + [l for l in reversed(active) if not l.loaded]
+
+    @property
+    def version(self):
+        """Changes whenever any answer could change (see cache.SpellCache)"""
+        return (self.changes,) + tuple(layer.version for layer in self.layers)
+
+    # --------- Same methods as Trie ---------
+    def add_word(self, word, frequency=1, layer=None):
+        """Add a word to the named layer (default: the first writable one)"""
+        if layer is None:
+            target = next((l for l in self.layers if l.writable), None)
+            if target is None:
+                raise ValueError("No writable layer to add words to")
+        else:
+            target = self.get_layer(layer)
+            if target is None:
+                raise ValueError(f"No layer called '{layer}'")
+        target.add_word(word, frequency)
+
+    def word_exists(self, word):
+        return any(layer.dictionary.word_exists(word) for layer in self.lookup_order())
+
+    def unknown(self, words):
+        """Words no active layer knows; each layer is only asked about what's left"""
+        missing = {w.lower() for w in words}
+        for layer in self.lookup_order():
+            if not missing:
+                break
+            missing = layer.dictionary.unknown(missing)
+        return missing
+
+    def find_suggestions(self, prefix, limit=TOP_K):
+        """Completions from each loaded layer in priority order, without repeats"""
+        results = []
+        seen = set()
+        for layer in self.loaded_layers():
+            for word in layer.dictionary.find_suggestions(prefix, limit):
+                if word not in seen:
+                    seen.add(word)
+                    results.append(word)
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def suggest(self, word, max_distance=2, limit=10):
+        """(distance, word) pairs from every loaded layer, closest first, ties by priority"""
+        return self._merge(layer.engine.suggest(word, max_distance, limit) for layer in self.loaded_layers())[:limit]
+
+    def find_sound_alikes(self, word, limit=10, max_distance=None):
+        """Sound-alike (distance, word) pairs from every loaded layer, closest first, ties by priority"""
+        return self._merge(layer.dictionary.find_sound_alikes(word, limit, max_distance)
+                           for layer in self.loaded_layers())[:limit]
+
+    def word_frequency(self, word):
+        """How common a word is in the first loaded layer that has it (0 if none does)"""
+        for layer in self.loaded_layers():
+            frequency = layer.dictionary.word_frequency(word)
+            if frequency:
+                return frequency
+        return 0
+
+    def _merge(self, results_per_layer):
+        """Helper: one list from each layer's (distance, word) pairs, without repeats"""
+        candidates = []
+        for rank, results in enumerate(results_per_layer):
+            for distance, w in results:
+                candidates.append((distance, rank, w))
+        candidates.sort(key=lambda c: c[:2])  # Stable: keeps each layer's own order for ties
+
+        results = []
+        seen = set()
+        for distance, _, w in candidates:
+            if w not in seen:
+                seen.add(w)
+                results.append((distance, w))
+        return results
+
+    @property
+    def all_words(self):
+        words = []
+        for layer in self.active_layers():
+            words.extend(layer.dictionary.all_words)
+        return words
+
+    @property
+    def word_count(self):
+        """Words in the loaded layers (a word in two layers counts twice)"""
+        return sum(layer.dictionary.word_count for layer in self.loaded_layers())
+
+    @property
+    def node_count(self):
+        return sum(layer.dictionary.node_count for layer in self.loaded_layers())
+
+    def loaded_dictionaries(self):
+        return [layer.dictionary for layer in self.loaded_layers()]
+
+
+class LayeredEngine(SuggestionEngine):
+    """Suggestions merged from each layer's own engine"""
+    name = "layered"
+
+    def suggest(self, word, max_distance=2, limit=10):
+        return self.dictionary.suggest(word, max_distance, limit)
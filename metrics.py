@@ -0,0 +1,217 @@
+"""
+Timing and size metrics
+File: metrics.py
+
+Metrics keeps latency histograms for the hot paths (lookup, completion,
+fuzzy suggestion, full-document check) and gauges for the dictionary
+(words, trie nodes, approximate memory). Everything can be exported as a
+Prometheus text file or a JSON snapshot.
+
+Timing is added by wrapping a function once, at startup:
+
+    metrics = Metrics()
+    lookup = metrics.instrument("lookup", dictionary.word_exists)
+
+When metrics are turned off (Metrics(enabled=False)), instrument() hands
+back the function itself, so the hot paths pay nothing at all. When on,
+each call costs two perf_counter() calls and a bucket increment.
+
+Usage:
+    metrics.write("metrics.prom")    # Prometheus text format
+    metrics.write("metrics.json")    # JSON snapshot
+"""
+
+import bisect
+import json
+import threading
+import time
+
+from compact_trie import estimate_trie_memory
+
+# Histogram bucket upper bounds, in seconds (1 microsecond to 10 seconds)
+LATENCY_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Names get this prefix when exported
+PREFIX = "spellchecker_"
+
+
+class Histogram:
+    """Counts observations in fixed buckets, like a Prometheus histogram"""
+    def __init__(self, name, help_text="", buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()  # Observed from worker threads too
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (None if empty)"""
+        if not self.count:
+            return None
+        rank = self.count * p / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        mean = self.sum / self.count if self.count else None
+        return {
+            "count": self.count,
+            "sum_seconds": self.sum,
+            "mean_seconds": mean,
+            "p50_seconds": self.percentile(50),
+            "p90_seconds": self.percentile(90),
+            "p99_seconds": self.percentile(99),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)},
+        }
+
+
+class Metrics:
+    """Named histograms and gauges, exportable as Prometheus text or JSON"""
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}   # name -> Histogram
+        self.gauges = {}       # name -> (function returning a number, help text)
+
+    def histogram(self, name, help_text=""):
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help_text)
+        return self.histograms[name]
+
+    def instrument(self, name, func, help_text=""):
+        """Return func, timed into histogram name (or func itself when metrics are off)"""
+        if not self.enabled:
+            return func
+        histogram = self.histogram(name, help_text or f"Time spent in {name}, in seconds")
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(clock() - start)
+        return timed
+
+    def gauge(self, name, func, help_text=""):
+        """Report func() as gauge name (only called when exporting)"""
+        if self.enabled:
+            self.gauges[name] = (func, help_text)
+
+    def watch_dictionary(self, dictionary):
+        """Gauges for the dictionary's word count, trie nodes and approximate memory"""
+        self.gauge("dictionary_words", lambda: dictionary.word_count, "Words in the dictionary")
+        self.gauge("trie_nodes", lambda: dictionary.node_count, "Nodes in the trie")
+        self.gauge("dictionary_memory_bytes", DictionaryMemory(dictionary), "Approximate memory used by the dictionary")
+
+    def read_gauges(self):
+        values = {}
+        for name, (func, _) in self.gauges.items():
+            try:
+                values[name] = func()
+            except Exception as e:
+                print(f"Could not read gauge {name}:", e)
+        return values
+
+    # --------- Export ---------
+    def snapshot(self):
+        """Everything as a plain dict (for JSON)"""
+        return {
+            "time": time.time(),
+            "enabled": self.enabled,
+            "histograms": {name: h.snapshot() for name, h in self.histograms.items()},
+            "gauges": self.read_gauges(),
+        }
+
+    def to_prometheus(self):
+        """Everything in the Prometheus text exposition format"""
+        lines = []
+        for name, histogram in self.histograms.items():
+            metric = f"{PREFIX}{name}_seconds"
+            lines.append(f"# HELP {metric} {histogram.help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum {histogram.sum}")
+            lines.append(f"{metric}_count {histogram.count}")
+        for name, value in self.read_gauges().items():
+            metric = PREFIX + name
+            lines.append(f"# HELP {metric} {self.gauges[name][1]}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write a JSON snapshot (.json) or Prometheus text (anything else) to path"""
+        if path.endswith(".json"):
+            text = json.dumps(self.snapshot(), indent=2)
+        else:
+            text = self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def summary(self):
+        """Short text for a stats panel: p50 per histogram, then the gauges"""
+        parts = []
+        for name, histogram in self.histograms.items():
+            p50 = histogram.percentile(50)
+            if p50 is not None:
+                parts.append(f"{name} ≤{format_seconds(p50)}")
+        gauges = self.read_gauges()
+        if "trie_nodes" in gauges:
+            parts.append(f"{gauges['trie_nodes']:,} nodes")
+        if "dictionary_memory_bytes" in gauges:
+            parts.append(f"~{gauges['dictionary_memory_bytes'] / (1024 * 1024):.1f} MB")
+        return " · ".join(parts)
+
+
+class DictionaryMemory:
+    """Gauge: approximate bytes used by a dictionary, re-measured only when it changes"""
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+        self.version = None
+        self.bytes = 0
+
+    def __call__(self):
+        if self.version != self.dictionary.version:
+            self.version = self.dictionary.version
+            # A LayeredDictionary (layers.py) is the sum of its loaded layers
+            if hasattr(self.dictionary, "loaded_dictionaries"):
+                dictionaries = self.dictionary.loaded_dictionaries()
+            else:
+                dictionaries = [self.dictionary]
+            self.bytes = sum(approximate_memory(d) for d in dictionaries)
+        return self.bytes
+
+
+def approximate_memory(dictionary):
+    """Bytes used by a Trie (estimated) or a CompactTrie (its arrays)"""
+    if hasattr(dictionary, "memory_report"):
+        return dictionary.memory_report()["compact_bytes"]
+    return estimate_trie_memory(dictionary)
+
+
+def format_seconds(seconds):
+    if seconds == float("inf"):
+        return "∞"
+    if seconds < 0.001:
+        return f"{seconds * 1e6:.0f}µs"
+    if seconds < 1:
+        return f"{seconds * 1000:.1f}ms"
+    return f"{seconds:.1f}s"
@@ -0,0 +1,170 @@
+"""
+Phonetic index for sound-alike suggestions
+File: phonetic.py
+
+Some misspellings are written the way a word sounds: "fone" for "phone",
+"nite" for "night". They are several changes away from the right word, so
+an edit-distance search with a small limit misses them, and raising the
+limit makes every search much slower.
+
+Instead, every word gets a Metaphone key, a rough spelling of how it
+sounds ("phone" and "fone" are both FN, "night" and "nite" are both NT),
+and PhoneticIndex maps each key to the words that have it. Finding the
+sound-alikes of a misspelling is then one key computation and one dict
+lookup; the Trie ranks them by calculate_difference (Trie.find_sound_alikes).
+
+A key leaves out vowels, so "not" and "need" are sound-alikes of "nite"
+too. metaphone(word, vowels=True) keeps them under the same rules ("nite"
+is NITE, "night" NIT, "need" NET), and how far apart two such keys are
+tells the likeliest sound-alikes from the rest (see engines.SoundAlikeEngine).
+
+The index is optional: a Trie or CompactTrie builds one from its words
+the first time sound-alikes are asked for (or when SoundAlikeEngine calls
+enable_phonetic_index), and the Trie then keeps it up to date in add_word.
+Dictionaries that never look for sound-alikes (batch_check, the server)
+don't pay for it.
+
+Usage:
+    python phonetic.py words.txt fone nite
+"""
+
+import sys
+import time
+
+VOWELS = frozenset("AEIOU")
+FRONT_VOWELS = frozenset("EIY")
+# H after these is part of a digraph (CH, GH, PH, SH, TH) handled by that letter
+DIGRAPH_STARTS = frozenset("CGPST")
+# Letters that stand for themselves
+PLAIN = frozenset("FJLMNR")
+
+
+def metaphone(word, vowels=False):
+    """
+    Metaphone key of a word (Lawrence Philips' original rules), '' if it has
+    no A-Z letters. vowels=True keeps the vowels after the first letter too.
+    """
+    word = word.upper()
+    if not (word.isascii() and word.isalpha()):
+        word = "".join(c for c in word if "A" <= c <= "Z")
+    if not word:
+        return ""
+
+    # Letters that are silent or change at the start of a word
+    if word[:2] in ("AE", "GN", "KN", "PN", "WR"):
+        word = word[1:]
+    elif word[:2] == "WH":
+        word = "W" + word[2:]
+    elif word[0] == "X":
+        word = "S" + word[1:]
+
+    code = []
+    last = len(word) - 1
+    for i, c in enumerate(word):
+        prev = word[i - 1] if i > 0 else ""
+        if c == prev and c != "C":
+            continue  # Double letters sound like one
+        following = word[i + 1] if i < last else ""
+        after = word[i + 2] if i + 1 < last else ""
+
+        if c in VOWELS:
+            if i == 0 or vowels:
+                code.append(c)
+        elif c in PLAIN:
+            code.append(c)
+        elif c == "B":
+            if not (prev == "M" and i == last):  # dumb, lamb
+                code.append("B")
+        elif c == "C":
+            if following == "H" or (following == "I" and after == "A"):
+                code.append("K" if prev == "S" else "X")  # school / church, special
+            elif following in FRONT_VOWELS:
+                if prev != "S":  # science: the S already made the sound
+                    code.append("S")
+            else:
+                code.append("K")
+        elif c == "D":
+            code.append("J" if following == "G" and after in FRONT_VOWELS else "T")
+        elif c == "G":
+            if prev == "D" and following in FRONT_VOWELS:
+                continue  # judge: the D already made the sound
+            if following == "H" and i + 2 <= last and after not in VOWELS:
+                continue  # night, daughter (a final GH is kept: "though" is 0K)
+            if following == "N" and (i + 1 == last or word[i + 1:] == "NED"):
+                continue  # sign, signed
+            code.append("J" if following in FRONT_VOWELS else "K")
+        elif c == "H":
+            if prev in DIGRAPH_STARTS or (prev in VOWELS and following not in VOWELS):
+                continue
+            code.append("H")
+        elif c == "K":
+            if prev != "C":
+                code.append("K")
+        elif c == "P":
+            code.append("F" if following == "H" else "P")
+        elif c == "Q":
+            code.append("K")
+        elif c == "S":
+            if following == "H" or (following == "I" and after in ("O", "A")):
+                code.append("X")
+            else:
+                code.append("S")
+        elif c == "T":
+            if following == "I" and after in ("O", "A"):
+                code.append("X")
+            elif following == "H":
+                code.append("0")  # "th"
+            elif not (following == "C" and after == "H"):  # watch
+                code.append("T")
+        elif c == "V":
+            code.append("F")
+        elif c in ("W", "Y"):
+            if following in VOWELS:
+                code.append(c)
+        elif c == "X":
+            code.append("KS")
+        elif c == "Z":
+            code.append("S")
+    return "".join(code)
+
+
+class PhoneticIndex:
+    """Maps each Metaphone key to the words that have it"""
+    def __init__(self, words=()):
+        self.codes = {}  # key -> list of words
+        self.size = 0    # Words indexed
+        for word in words:
+            self.add_word(word)
+
+    def add_word(self, word):
+        """Index a word (callers add each word once)"""
+        code = metaphone(word)
+        if code:
+            self.codes.setdefault(code, []).append(word)
+            self.size += 1
+
+    def lookup(self, word):
+        """Words with the same key as word (not ranked)"""
+        return self.codes.get(metaphone(word), ())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python phonetic.py words.txt word [word ...]")
+        sys.exit(1)
+
+    from dictionary import Trie
+
+    trie = Trie()
+    start = time.perf_counter()
+    trie.load_word_list(sys.argv[1])
+    index = trie.enable_phonetic_index()
+    print(f"{trie.word_count} words loaded and indexed in {time.perf_counter() - start:.2f}s, "
+          f"{len(index.codes)} phonetic keys")
+
+    for word in sys.argv[2:]:
+        start = time.perf_counter()
+        sound_alikes = trie.find_sound_alikes(word, 8)
+        elapsed = time.perf_counter() - start
+        shown = ", ".join(f"{w} ({d})" for d, w in sound_alikes) or "none"
+        print(f"{word} -> {metaphone(word)} in {elapsed * 1000:.2f} ms: {shown}")
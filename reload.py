@@ -0,0 +1,127 @@
+"""
+Hot reload of the dictionary
+File: reload.py
+
+A long-running process (like spell_server.py) loads its word list once.
+To pick up a new list without a restart, SnapshotManager builds a whole
+new Snapshot (dictionary, suggestion engine, cache) in the background and
+then publishes it with a single attribute assignment:
+
+    manager = SnapshotManager(build)      # build() -> (dictionary, engine, cache)
+    snapshot = manager.current            # readers: take one snapshot per request...
+    snapshot.cache.word_exists("teh")     # ...and use only it until done
+    manager.reload()                      # from a background thread
+
+Readers never lock: reading manager.current is one attribute read, and a
+snapshot is never changed after it is published, so a reader that took
+the old snapshot keeps a consistent view until it finishes. Nothing else
+refers to an old snapshot, and the dictionaries avoid reference cycles
+(a compiled file's index only has a weak proxy back to its dictionary),
+so Python frees it as soon as its last reader lets go; stats() shows how
+many are still alive.
+
+Each reload reports how long the build took and how long the swap took,
+and the process's peak resident memory before and after the build
+(cheap, but only on Unix; None elsewhere). If the peak went up, the
+build set a new high. With measure_memory=True it also reports the peak
+memory allocated while building. That uses tracemalloc, which slows every
+thread in the process and counts their allocations too. So it is off by
+default, and it is skipped when something else is already tracing.
+"""
+
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Reload reports kept for stats()
+REPORTS_KEPT = 10
+
+
+def peak_rss():
+    """Most memory the process has had resident so far, in bytes (None without the resource module)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux counts in KB
+
+
+class Snapshot:
+    """One version of the dictionary and everything built from it (read-only once published)"""
+    def __init__(self, version, dictionary, engine, cache=None):
+        self.version = version
+        self.dictionary = dictionary
+        self.engine = engine
+        self.cache = cache
+        self.created = time.time()
+
+
+class SnapshotManager:
+    """Holds the current Snapshot and swaps in freshly built ones"""
+    def __init__(self, build, measure_memory=False):
+        self.build = build                  # Function returning (dictionary, engine, cache)
+        self.measure_memory = measure_memory
+        self.reload_lock = threading.Lock() # One reload at a time (readers never take it)
+        self.retired = weakref.WeakSet()    # Old snapshots, until their last reader is done
+        self.reports = deque(maxlen=REPORTS_KEPT)
+        self.current = self._build(1)
+
+    def _build(self, version):
+        dictionary, engine, cache = self.build()
+        return Snapshot(version, dictionary, engine, cache)
+
+    def reload(self):
+        """Build a new snapshot and swap it in (blocks; run it off the main thread). Returns the report."""
+        with self.reload_lock:
+            # Only trace if nobody else is (their peak is not ours to reset)
+            started_tracing = self.measure_memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            try:
+                rss_before = peak_rss()
+                start = time.perf_counter()
+                snapshot = self._build(self.current.version + 1)
+                build_seconds = time.perf_counter() - start
+                rss_after = peak_rss()
+                peak = tracemalloc.get_traced_memory()[1] if started_tracing else None
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+
+            # The swap itself: readers see either the old or the new snapshot
+            start = time.perf_counter()
+            old = self.current
+            self.current = snapshot
+            swap_seconds = time.perf_counter() - start
+            self.retired.add(old)
+
+            report = {
+                "version": snapshot.version,
+                "words": snapshot.dictionary.word_count,
+                "previous_words": old.dictionary.word_count,
+                "build_seconds": round(build_seconds, 3),
+                "swap_microseconds": round(swap_seconds * 1e6, 2),
+                "peak_build_bytes": peak,
+                "peak_rss_before_bytes": rss_before,
+                "peak_rss_after_bytes": rss_after,
+                "time": snapshot.created,
+            }
+            self.reports.append(report)
+            return report
+
+    def stats(self):
+        current = self.current
+        return {
+            "version": current.version,
+            "words": current.dictionary.word_count,
+            "loaded_at": current.created,
+            "old_snapshots_alive": len(self.retired),
+            "reloads": list(self.reports),
+        }
@@ -1,109 +1,39 @@
+import argparse
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
+from dictionary import TOP_K, TrieNode, Trie, calculate_difference, DEFAULT_WORDS
+from cache import SpellCache
+from engines import ENGINES, DEFAULT_ENGINE, SoundAlikeEngine, create_engine
+from metrics import Metrics
+from workers import BackgroundWorker, LoadingState
 
-# ==========================================
-# PART 1: Simple Data Structures
-# ==========================================
 
-class TrieNode:
-    """A single node in our Trie tree"""
-    def __init__(self):
-        self.children = {}  # Store child letters
-        self.is_word = False  # Is this the end of a word?
+def build_dictionary(engine=DEFAULT_ENGINE, dictionary_path=None):
+    """
+    Load the dictionary and build the suggestion engine, returns both.
+    The app runs this in the background; it needs no Tk, so benchmark.py
+    --startup times it too.
+    """
+    # Create our dictionary (or open a compiled one, see dictionary_file.py)
+    if dictionary_path:
+        from dictionary_file import open_dictionary
+        dictionary = open_dictionary(dictionary_path)
+    else:
+        dictionary = Trie()
+        load_words(dictionary)
 
-class Trie:
-    """A tree structure to store words efficiently"""
-    def __init__(self):
-        self.root = TrieNode()
-        self.all_words = []  # Keep all words in a list too
-    
-    def add_word(self, word):
-        """Add a word to our dictionary"""
-        word = word.lower()
-        node = self.root
-        
-        # Go through each letter
-        for letter in word:
-            if letter not in node.children:
-                node.children[letter] = TrieNode()
-            node = node.children[letter]
-        
-        node.is_word = True
-        self.all_words.append(word)
-    
-    def word_exists(self, word):
-        """Check if a word is in our dictionary"""
-        word = word.lower()
-        node = self.root
-        
-        # Try to find each letter
-        for letter in word:
-            if letter not in node.children:
-                return False
-            node = node.children[letter]
-        
-        return node.is_word
-    
-    def find_suggestions(self, prefix):
-        """Find all words that start with prefix"""
-        prefix = prefix.lower()
-        node = self.root
-        
-        # Navigate to the prefix
-        for letter in prefix:
-            if letter not in node.children:
-                return []
-            node = node.children[letter]
-        
-        # Find all words from this point
-        suggestions = []
-        self._find_all_words(node, prefix, suggestions)
-        return suggestions[:10]  # Return top 10
-    
-    def _find_all_words(self, node, current_word, suggestions):
-        """Helper: Find all words starting from a node"""
-        if node.is_word:
-            suggestions.append(current_word)
-        
-        for letter, child in node.children.items():
-            self._find_all_words(child, current_word + letter, suggestions)
+    # Pick how suggestions are found (see engines.py), plus words that
+    # sound alike ("fone" -> "phone") even if more than 3 changes away
+    options = {}
+    if engine == "deletes":
+        options["max_distance"] = 3  # Index must cover our 3-change limit
+    return dictionary, SoundAlikeEngine(create_engine(engine, dictionary, **options))
 
 
-def calculate_difference(word1, word2):
-    """
-    Count how many changes needed to turn word1 into word2
-    (insert, delete, or replace letters)
-    """
-    len1 = len(word1)
-    len2 = len(word2)
-    
-    # Create a table to store results
-    table = []
-    for i in range(len1 + 1):
-        row = []
-        for j in range(len2 + 1):
-            row.append(0)
-        table.append(row)
-    
-    # Fill first column and row
-    for i in range(len1 + 1):
-        table[i][0] = i
-    for j in range(len2 + 1):
-        table[0][j] = j
-    
-    # Fill the rest of the table
-    for i in range(1, len1 + 1):
-        for j in range(1, len2 + 1):
-            if word1[i-1] == word2[j-1]:
-                table[i][j] = table[i-1][j-1]  # Letters match
-            else:
-                table[i][j] = 1 + min(
-                    table[i-1][j],      # Delete
-                    table[i][j-1],      # Insert
-                    table[i-1][j-1]     # Replace
-                )
-    
-    return table[len1][len2]
+def load_words(dictionary):
+    """Load all dictionary words"""
+    for word in DEFAULT_WORDS:
+        dictionary.add_word(word)
 
 
 # ==========================================
@@ -111,59 +41,63 @@ def calculate_difference(word1, word2):
 # ==========================================
 
 class SpellCheckerApp:
-    def __init__(self, root):
+    def __init__(self, root, engine=DEFAULT_ENGINE, dictionary_path=None, metrics=True):
         self.root = root
         self.root.title("Spell Checker & Auto-Suggest")
         self.root.geometry("800x700")
         self.root.resizable(False, False)
         self.root.config(bg="#f5f5f5")
         
-        # Create our dictionary
-        self.dictionary = Trie()
-        self.load_words()
+        # Set up by dictionary_ready() once the dictionary has loaded
+        self.dictionary = None
+        self.engine = None
+        self.cache = None
+        self.cursor = None
+        
+        # Time the hot paths (see metrics.py); with metrics off these are the plain functions
+        self.metrics = Metrics(enabled=metrics)
         
         # Track statistics
         self.total_checks = 0
         self.total_corrections = 0
         
+        # Loading and similar-word searches run off the UI thread (see workers.py)
+        self.worker = BackgroundWorker(root)
+        self.last_typed = ""
+        
         self.setup_gui()
+        
+        # The window shows at once; typing and checking wait for the dictionary
+        self.loading = LoadingState(self.worker, lambda: build_dictionary(engine, dictionary_path),
+                                    self.dictionary_ready, self.loading_failed)
     
-    def load_words(self):
-        """Load all dictionary words"""
-        words = [
-            # Programming words
-            "algorithm", "application", "binary", "code", "computer", "data",
-            "database", "debug", "function", "hardware", "internet", "java",
-            "language", "memory", "network", "program", "python", "software",
-            "system", "technology", "tree", "trie", "variable", "web",
-            
-            # Common words
-            "about", "after", "again", "all", "also", "always", "and",
-            "answer", "any", "apple", "are", "around", "ask", "back",
-            "because", "before", "being", "between", "both", "but", "call",
-            "came", "can", "change", "come", "could", "create", "day",
-            "did", "different", "do", "does", "down", "each", "even",
-            "every", "find", "first", "follow", "for", "from", "get",
-            "give", "good", "great", "had", "has", "have", "help",
-            "here", "high", "home", "how", "important", "into", "is",
-            "it", "just", "know", "large", "last", "like", "little",
-            "long", "look", "made", "make", "many", "may", "more",
-            "most", "move", "much", "name", "need", "new", "next",
-            "not", "now", "number", "of", "old", "on", "one",
-            "only", "or", "other", "our", "out", "over", "part",
-            "people", "place", "program", "put", "said", "same", "say",
-            "school", "see", "she", "should", "show", "small", "some",
-            "take", "tell", "than", "that", "the", "their", "them",
-            "then", "there", "these", "they", "thing", "think", "this",
-            "time", "to", "too", "two", "under", "up", "use",
-            "very", "want", "was", "water", "way", "we", "well",
-            "were", "what", "when", "where", "which", "who", "will",
-            "with", "word", "work", "world", "would", "write", "year",
-            "you", "your"
-        ]
-        
-        for word in words:
-            self.dictionary.add_word(word)
+    def dictionary_ready(self, loaded):
+        """Start using the loaded dictionary (called on the UI thread, before any queued requests)"""
+        self.dictionary, self.engine = loaded
+        
+        # Remember recent answers (cleared when the dictionary changes)
+        self.cache = SpellCache(self.dictionary.word_exists, self.engine.suggest, self.dictionary)
+        
+        self.metrics.watch_dictionary(self.dictionary)
+        self.lookup = self.metrics.instrument("lookup", self.cache.word_exists, "Time to check one word")
+        self.complete = self.metrics.instrument("complete", self.complete_typed,
+                                                "Time to find completions for a prefix")
+        self.suggest = self.metrics.instrument("suggest", self.cache.suggest,
+                                               "Time to find similar words for a misspelling")
+        
+        # Follows the typed word letter by letter, so completing costs
+        # the same for every keystroke (see CompletionCursor)
+        self.cursor = self.dictionary.cursor()
+        
+        self.words_label.config(text=f"📚 Dictionary: {self.dictionary.word_count} words")
+        if not self.loading.queued:
+            self.suggestions.delete(0, tk.END)
+        self.update_stats()
+    
+    def loading_failed(self, error):
+        self.words_label.config(text="📚 Dictionary: not loaded")
+        self.suggestions.delete(0, tk.END)
+        messagebox.showerror("Dictionary", f"Could not load the dictionary:\n{error}")
     
     def setup_gui(self):
         """Create all visual elements"""
@@ -296,7 +230,7 @@ class SpellCheckerApp:
         
         self.words_label = tk.Label(
             stats_inner,
-            text=f"📚 Dictionary: {len(self.dictionary.all_words)} words",
+            text="📚 Dictionary: loading...",
             font=("Arial", 10),
             bg="#e3f2fd",
             fg="#1976D2"
@@ -320,20 +254,81 @@ class SpellCheckerApp:
             fg="#1976D2"
         )
         self.fixes_label.pack(side=tk.LEFT, padx=20)
+        
+        self.cache_label = tk.Label(
+            stats_inner,
+            text="⚡ Cache hits: 0%",
+            font=("Arial", 10),
+            bg="#e3f2fd",
+            fg="#1976D2"
+        )
+        self.cache_label.pack(side=tk.LEFT, padx=20)
+        
+        # Timings and dictionary size (see metrics.py)
+        metrics_row = tk.Frame(stats, bg="#e3f2fd")
+        metrics_row.pack(fill=tk.X, pady=(0, 8))
+        
+        self.metrics_label = tk.Label(
+            metrics_row,
+            text=self.metrics.summary() if self.metrics.enabled else "⏱ Metrics off",
+            font=("Arial", 9),
+            bg="#e3f2fd",
+            fg="#607D8B"
+        )
+        self.metrics_label.pack(side=tk.LEFT, padx=20)
+        
+        export_button = tk.Button(
+            metrics_row,
+            text="Export metrics",
+            command=self.export_metrics,
+            font=("Arial", 9),
+            relief=tk.FLAT,
+            cursor="hand2",
+            state=tk.NORMAL if self.metrics.enabled else tk.DISABLED
+        )
+        export_button.pack(side=tk.RIGHT, padx=20)
     
     def show_suggestions(self, event):
         """Show suggestions as user types"""
         typed = self.word_input.get().strip()
-        self.suggestions.delete(0, tk.END)
+        
+        # Keys like Enter or the arrows don't change the text
+        if typed == self.last_typed:
+            return
+        self.last_typed = typed
+        self.worker.cancel("similar")
         
         if typed:
-            matches = self.dictionary.find_suggestions(typed)
-            
-            if matches:
-                for word in matches:
-                    self.suggestions.insert(tk.END, f"  {word}")
-            else:
-                self.suggestions.insert(tk.END, "  No suggestions")
+            if not self.loading.ready:
+                self.show_loading()
+            self.loading.run("complete", self.show_completions_for, typed)
+        else:
+            self.loading.cancel("complete")
+            self.suggestions.delete(0, tk.END)
+    
+    def show_completions_for(self, typed):
+        self.show_completions(self.complete(typed))
+    
+    def show_loading(self):
+        """Tell the user their request waits for the dictionary"""
+        self.suggestions.delete(0, tk.END)
+        self.suggestions.insert(tk.END, "  ⏳ Loading dictionary...")
+    
+    def complete_typed(self, typed):
+        """Completions for the typed text, one cursor step per added or removed letter"""
+        self.cursor.set_text(typed)
+        return self.cursor.completions()
+    
+    def show_completions(self, matches):
+        """Fill the list with prefix matches"""
+        self.suggestions.delete(0, tk.END)
+        
+        if matches:
+            for word in matches:
+                self.suggestions.insert(tk.END, f"  {word}")
+        else:
+            self.suggestions.insert(tk.END, "  No suggestions")
+        self.update_stats()
     
     def check_word(self):
         """Check if the word is spelled correctly"""
@@ -347,11 +342,22 @@ class SpellCheckerApp:
             messagebox.showerror("Invalid", "Please use only letters!")
             return
         
+        if not self.loading.ready:
+            self.show_loading()
+            self.result_text.config(
+                text=f"⏳ Will check '{typed}' once the dictionary has loaded.",
+                fg="#607D8B",
+                font=("Arial", 13, "italic")
+            )
+        self.loading.run("check", self.check_typed, typed)
+    
+    def check_typed(self, typed):
+        """Look up a word and show the result"""
         self.total_checks += 1
         self.update_stats()
         
         # Check if word exists
-        if self.dictionary.word_exists(typed):
+        if self.lookup(typed):
             self.result_text.config(
                 text=f"✓ Correct! '{typed}' is spelled right.",
                 fg="#4CAF50",
@@ -373,29 +379,22 @@ class SpellCheckerApp:
         """Find words that are similar to the misspelled word"""
         self.suggestions.delete(0, tk.END)
         self.suggestions.insert(tk.END, "  🔄 Searching...")
-        self.root.update()
-        
-        similar = []
-        
-        # Compare with all dictionary words
-        for word in self.dictionary.all_words:
-            difference = calculate_difference(wrong_word.lower(), word)
-            
-            # Only keep words that are close
-            if difference <= 3:
-                similar.append((difference, word))
-        
-        # Sort by how similar they are
-        similar.sort()
         
+        # Find words up to 3 changes away in the background
+        # (already sorted by how similar they are)
+        self.worker.submit("similar", self.suggest, (wrong_word, 3, 8), self.show_similar_words)
+    
+    def show_similar_words(self, similar):
+        """Fill the list with "did you mean" words (called back on the UI thread)"""
         self.suggestions.delete(0, tk.END)
         
         if similar:
             self.suggestions.insert(tk.END, "  📝 Did you mean:")
-            for diff, word in similar[:8]:
+            for diff, word in similar:
                 self.suggestions.insert(tk.END, f"    • {word} (changes: {diff})")
         else:
             self.suggestions.insert(tk.END, "  ✗ No similar words found")
+        self.update_stats()
     
     def use_suggestion(self, event):
         """Fill input when clicking a suggestion"""
@@ -423,9 +422,36 @@ class SpellCheckerApp:
         """Update the statistics display"""
         self.checks_label.config(text=f"🔍 Checks: {self.total_checks}")
         self.fixes_label.config(text=f"✓ Corrections: {self.total_corrections}")
+        if self.cache is None:
+            return
+        
+        stats = self.cache.stats()
+        hits = stats["lookup"]["hits"] + stats["suggest"]["hits"]
+        total = hits + stats["lookup"]["misses"] + stats["suggest"]["misses"]
+        rate = round(100 * hits / total) if total else 0
+        self.cache_label.config(text=f"⚡ Cache hits: {rate}%")
+        if self.metrics.enabled:
+            self.metrics_label.config(text=self.metrics.summary())
+    
+    def export_metrics(self):
+        """Save the metrics as Prometheus text (.prom) or a JSON snapshot (.json)"""
+        path = filedialog.asksaveasfilename(
+            defaultextension=".prom",
+            filetypes=[("Prometheus text", "*.prom"), ("JSON snapshot", "*.json"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            self.metrics.write(path)
+        except OSError as e:
+            messagebox.showerror("Export failed", f"Could not write {path}:\n{e}")
     
     def clear_all(self):
         """Clear everything"""
+        self.worker.cancel("similar")
+        self.loading.cancel("check")
+        self.loading.cancel("complete")
+        self.last_typed = ""
         self.word_input.delete(0, tk.END)
         self.suggestions.delete(0, tk.END)
         self.result_text.config(text="")
@@ -437,6 +463,15 @@ class SpellCheckerApp:
 # ==========================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spell Checker & Auto-Suggest")
+    parser.add_argument("--engine", choices=list(ENGINES), default=DEFAULT_ENGINE,
+                        help="how to find similar words (default: %(default)s)")
+    parser.add_argument("--dict", dest="dictionary_path",
+                        help="compiled dictionary file to use instead of the built-in words")
+    parser.add_argument("--no-metrics", dest="metrics", action="store_false",
+                        help="turn off timing of lookups, completions and suggestions")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = SpellCheckerApp(root)
-    root.mainloop()
\ No newline at end of file
+    app = SpellCheckerApp(root, engine=args.engine, dictionary_path=args.dictionary_path, metrics=args.metrics)
+    root.mainloop()
\ No newline at end of file
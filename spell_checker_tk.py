@@ -2,37 +2,192 @@
 Simple Spell Checker with Tkinter GUI
 File: spell_checker_tk.py
 Requirements:
-    pip install pyspellchecker
+    none beyond the standard library
+    optional: pip install pyspellchecker (bigger word list, "pyspellchecker" engine)
 
 Features:
 - Open / Save files
 - Check spelling (F7) and highlight misspelled words
 - Right-click a misspelled word to get suggestions and replace
-- Add word to personal dictionary (stored in user_words.txt)
+- Add word to personal dictionary (stored in user_words.txt, shared safely
+  with other open instances, see user_store.py)
+- Extra domain word lists (--domain medical=medical.txt), loaded only when
+  needed and switched on/off from Tools > Dictionaries (see layers.py)
 - Status bar and basic keyboard shortcuts
+- Choose the suggestion engine at startup (--engine, see engines.py)
+- After the first check, edits only re-check the lines they touched
+- Large files load in chunks; checks do the visible lines first and the
+  rest in small slices while the app is idle, so it never locks up
+- Checks look up each distinct word once, in one batch (see document.py)
+- Suggestions include words that sound alike ("fone" -> "phone", see phonetic.py)
+- Timings of checks and suggestions, exportable from Tools (see metrics.py)
+- The window opens at once; the base word list loads in the background and
+  checks asked for meanwhile start as soon as it is ready
 
 Author: ChatGPT (GPT-5 Thinking mini)
 """
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog
-from spellchecker import SpellChecker
+import argparse
+import importlib.util
 import re
 import os
+import time
+
+from distance import bounded_distance
+from cache import SpellCache
+from document import check_document
+from engines import ENGINES, DEFAULT_ENGINE, SoundAlikeEngine, SuggestionEngine
+from dictionary import Trie, DEFAULT_WORDS
+from layers import DictionaryLayer, LayeredDictionary, LayeredEngine
+from metrics import Metrics
+from user_store import PersonalDictionary
+from workers import BackgroundWorker, LoadingState
 
 # Constants
 USER_DICT_FILE = "user_words.txt"
+# How often to pick up words other instances added to the user dictionary
+USER_SYNC_MS = 2000
+PYSPELLCHECKER_ENGINE = "pyspellchecker"
+# pyspellchecker is only imported when its word list is loaded (in the background)
+PYSPELLCHECKER_INSTALLED = importlib.util.find_spec("spellchecker") is not None
+ENGINE_CHOICES = list(ENGINES) + ([PYSPELLCHECKER_ENGINE] if PYSPELLCHECKER_INSTALLED else [])
+# Ranges given to each tag_add call when highlighting in bulk
+TAG_BATCH = 1000
+# Characters inserted per step while opening a file
+LOAD_CHUNK = 1024 * 1024
+# Lines checked at a time, and how long one idle-time slice may run (seconds)
+CHECK_BLOCK = 200
+CHECK_SLICE = 0.02
+
+
+def offsets_to_indices(text, tokens, first_line=1):
+    """
+    Turn (word, start, end) character offsets into Tk "line.col" (start_index, end_index),
+    for text that starts at line first_line of the widget (no Tk calls; benchmark.py times it)
+    """
+    # Where each line starts, so offsets turn straight into "line.col"
+    # (Tk would otherwise walk from 1.0 for every "1.0 + N chars" index)
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+    line = 0
+    indices = []
+    for w, start_pos, end_pos in tokens:
+        # Tokens come in order, so the current line only moves forward
+        while line + 1 < len(line_starts) and line_starts[line + 1] <= start_pos:
+            line += 1
+        # words never span lines
+        column = start_pos - line_starts[line]
+        indices.append((f"{line + first_line}.{column}", f"{line + first_line}.{column + end_pos - start_pos}"))
+    return indices
+
+
+def tag_batches(ranges, size=TAG_BATCH):
+    """Yield (batch, tag_add arguments) for every size (start, end) ranges"""
+    for i in range(0, len(ranges), size):
+        batch = ranges[i:i + size]
+        yield batch, [index for pair in batch for index in pair]
+
+
+class PySpellCheckerEngine(SuggestionEngine):
+    """Suggestions from pyspellchecker's candidates(), ranked by distance"""
+    name = PYSPELLCHECKER_ENGINE
+
+    def suggest(self, word, max_distance=2, limit=10):
+        candidates = self.dictionary.candidates(word) or ()
+        results = []
+        for c in candidates:
+            difference = bounded_distance(word, c, max_distance)
+            if difference <= max_distance:
+                results.append((difference, c))
+        results.sort()
+        return results[:limit]
+
+    def add_word(self, word):
+        self.dictionary.word_frequency.add(word)
+
+
+class SpellBackend:
+    """
+    The app's dictionary layers and suggestion engine, without any Tk, so
+    benchmark.py --startup can time the same loading the app does.
+    """
+    def __init__(self, engine=DEFAULT_ENGINE, user_words=(), domains=()):
+        self.engine_name = engine
+        self.user_words = user_words  # Live list of personal words (a PersonalDictionary)
+        self.spell_checker = None  # pyspellchecker's SpellChecker, see get_spell_checker
+        self.dictionary = self.load_dictionary(engine, domains)
+
+    def load_dictionary(self, engine, domains=()):
+        """
+        Layers, highest priority first: user words, then each (name, path)
+        domain word list, then the base words. Nothing is loaded until used.
+        """
+        # The pyspellchecker engine doesn't use the layers' own engines
+        layer_engine = DEFAULT_ENGINE if engine == PYSPELLCHECKER_ENGINE else engine
+        # The user layer reads the live word list, so it is complete whenever it gets loaded
+        layers = [DictionaryLayer.from_words("user", self.user_words, engine=layer_engine, writable=True)]
+        for name, path in domains:
+            layers.append(DictionaryLayer.from_path(name, path, engine=layer_engine))
+        layers.append(DictionaryLayer("base", self.load_base_words, engine=layer_engine))
+        return LayeredDictionary(layers)
+
+    def load_base_words(self):
+        """Base layer: pyspellchecker's word list if installed, else the built-in words"""
+        dictionary = Trie()
+        if PYSPELLCHECKER_INSTALLED:
+            for w, count in self.get_spell_checker().word_frequency.items():
+                dictionary.add_word(w, count)
+        else:
+            for w in DEFAULT_WORDS:
+                dictionary.add_word(w)
+        return dictionary
+
+    def get_spell_checker(self):
+        """pyspellchecker's SpellChecker, created once (loading its word list is slow)"""
+        if self.spell_checker is None:
+            from spellchecker import SpellChecker
+            self.spell_checker = SpellChecker()
+        return self.spell_checker
+
+    def create_engine(self, name):
+        """Build the suggestion engine chosen at startup, plus sound-alikes from the layers"""
+        if name == PYSPELLCHECKER_ENGINE:
+            engine = PySpellCheckerEngine(self.get_spell_checker())
+        else:
+            # Each layer builds its own index for this engine when first used
+            engine = LayeredEngine(self.dictionary)
+        return SoundAlikeEngine(engine, self.dictionary)
+
+    def preload(self):
+        """Load the base layer (and its index) and build the engine; the app runs this in the background"""
+        # The pyspellchecker engine doesn't use the layer's own engine
+        self.dictionary.get_layer("base").load(engine=self.engine_name != PYSPELLCHECKER_ENGINE)
+        return self.create_engine(self.engine_name)
+
 
 class SpellCheckerApp:
-    def __init__(self, root):
+    def __init__(self, root, engine=DEFAULT_ENGINE, metrics=True, domains=()):
         self.root = root
         self.root.title("Tkinter Spell Checker")
         self.root.geometry("900x600")
 
-        # Spell checker backend
-        self.sp = SpellChecker()
-        self.user_words = set()
-        self.load_user_words()
+        # Spell checker backend: user, domain and base word lists as layers
+        # (see layers.py), checked a whole document at a time
+        self.user_words = PersonalDictionary(USER_DICT_FILE)
+        self.backend = SpellBackend(engine, self.user_words, domains)
+        self.dictionary = self.backend.dictionary
+        # Set by dictionary_ready once the base words have loaded
+        self.engine = None
+        self.cache = None
+
+        # Time the hot paths (see metrics.py); with metrics off these are the plain functions
+        self.metrics = Metrics(enabled=metrics)
+        self.metrics.watch_dictionary(self.dictionary)
+        self.check_block = self.metrics.instrument("check_block", self.check_lines,
+                                                   f"Time to check {CHECK_BLOCK} lines of a full check")
+        self.check_lines_timed = self.metrics.instrument("check_lines", self.check_lines,
+                                                         "Time to re-check edited lines")
 
         # Menu
         self.create_menu()
@@ -45,12 +200,32 @@ class SpellCheckerApp:
         self.text.pack(fill="both", expand=True, padx=4, pady=(0,4))
         self.text.tag_configure("misspelled", underline=True, foreground="red")
 
+        # Edit tracking: changed lines are remembered with pairs of marks
+        # (Tk moves marks along with the text) and re-checked when idle
+        self.dirty_marks = []
+        self.dirty_counter = 0
+        self.dirty_check_pending = False
+        self.live_checking = False  # Turned on by the first full check
+        self.track_edits()
+
+        # Full checks: lines still to check, also kept as pairs of marks,
+        # worked through in slices when idle (see check_slice)
+        self.check_queue = []
+        self.check_counter = 0
+        self.check_slice_pending = False
+        self.check_started = None
+        self.lines_queued = 0
+        self.lines_checked = 0
+
+        # File being opened in chunks (see load_chunk)
+        self.loading = None
+
         # Right-click menu for suggestions
         self.suggest_menu = tk.Menu(root, tearoff=0)
 
         # Status bar
         self.status = tk.StringVar()
-        self.status.set("Ready")
+        self.status.set("Loading dictionary...")
         status_bar = tk.Label(root, textvariable=self.status, anchor="w")
         status_bar.pack(side="bottom", fill="x")
 
@@ -64,6 +239,14 @@ class SpellCheckerApp:
         # Current file
         self.current_file = None
 
+        self.root.after(USER_SYNC_MS, self.sync_user_words)
+
+        # Load the base words and engine in the background (see workers.py);
+        # checks asked for before then wait in self.startup
+        self.worker = BackgroundWorker(root, threads=1)
+        self.startup = LoadingState(self.worker, self.backend.preload,
+                                    self.dictionary_ready, self.loading_failed)
+
     # --------- File and menu functions ---------
     def create_menu(self):
         menubar = tk.Menu(self.root)
@@ -78,6 +261,10 @@ class SpellCheckerApp:
         toolmenu = tk.Menu(menubar, tearoff=0)
         toolmenu.add_command(label="Check Spelling (F7)", command=self.check_spelling)
         toolmenu.add_command(label="Add Word to Dictionary...", command=self.add_word_dialog)
+        toolmenu.add_cascade(label="Dictionaries", menu=self.create_layer_menu(toolmenu))
+        toolmenu.add_separator()
+        toolmenu.add_command(label="Metrics...", command=self.show_metrics)
+        toolmenu.add_command(label="Export Metrics...", command=self.export_metrics)
         menubar.add_cascade(label="Tools", menu=toolmenu)
 
         helpmenu = tk.Menu(menubar, tearoff=0)
@@ -86,6 +273,24 @@ class SpellCheckerApp:
 
         self.root.config(menu=menubar)
 
+    def create_layer_menu(self, parent):
+        """One checkbox per dictionary layer"""
+        menu = tk.Menu(parent, tearoff=0)
+        self.layer_vars = {}
+        for layer in self.dictionary.layers:
+            var = tk.BooleanVar(value=layer.active)
+            self.layer_vars[layer.name] = var
+            menu.add_checkbutton(label=layer.name, variable=var,
+                                 command=lambda name=layer.name: self.toggle_layer(name))
+        return menu
+
+    def toggle_layer(self, name):
+        active = self.layer_vars[name].get()
+        self.dictionary.set_active(name, active)
+        self.status.set(f"Dictionary '{name}' {'on' if active else 'off (unloaded)'}")
+        if self.live_checking:
+            self.check_spelling()
+
     def create_toolbar(self):
         toolbar = tk.Frame(self.root)
         btn_check = tk.Button(toolbar, text="Check (F7)", command=self.check_spelling)
@@ -95,7 +300,25 @@ class SpellCheckerApp:
         toolbar.pack(fill="x")
 
     def show_about(self):
-        messagebox.showinfo("About", "Simple Python Spell Checker\nUsing pyspellchecker and Tkinter")
+        messagebox.showinfo("About", "Simple Python Spell Checker\nUsing a Trie dictionary and Tkinter")
+
+    def show_metrics(self):
+        if not self.metrics.enabled:
+            messagebox.showinfo("Metrics", "Metrics are turned off (--no-metrics)")
+            return
+        messagebox.showinfo("Metrics", self.metrics.summary().replace(" · ", "\n") or "Nothing measured yet")
+
+    def export_metrics(self):
+        """Save the metrics as Prometheus text (.prom) or a JSON snapshot (.json)"""
+        fname = filedialog.asksaveasfilename(defaultextension='.prom',
+                                             filetypes=[('Prometheus text', '*.prom'), ('JSON snapshot', '*.json'), ('All files','*.*')])
+        if not fname:
+            return
+        try:
+            self.metrics.write(fname)
+            self.status.set(f"Saved metrics to {os.path.basename(fname)}")
+        except OSError as e:
+            messagebox.showerror("Export failed", str(e))
 
     def open_file_event(self, event=None):
         self.open_file()
@@ -111,15 +334,57 @@ class SpellCheckerApp:
         fname = filedialog.askopenfilename(filetypes=[("Text files","*.txt"), ("All files","*.*")])
         if not fname:
             return
-        with open(fname, 'r', encoding='utf-8') as f:
-            data = f.read()
+        try:
+            f = open(fname, 'r', encoding='utf-8')
+        except OSError as e:
+            messagebox.showerror("Open failed", str(e))
+            return
+        self.stop_loading()
         self.text.delete(1.0, tk.END)
-        self.text.insert(tk.END, data)
-        self.current_file = fname
-        self.status.set(f"Opened {os.path.basename(fname)}")
         self.clear_highlights()
+        self.current_file = fname
+
+        # Insert the file a chunk at a time when idle, checking as it arrives.
+        # Undo is off meanwhile, or it would keep a second copy of the file.
+        self.loading = f
+        self.loaded_chars = 0
+        self.text.configure(undo=False)
+        self.when_ready("check", self.start_check)
+        self.load_chunk()
+
+    def load_chunk(self):
+        """Insert the next chunk of the file being opened"""
+        if self.loading is None:
+            return
+        try:
+            data = self.loading.read(LOAD_CHUNK)
+        except (OSError, UnicodeDecodeError) as e:
+            self.stop_loading()
+            messagebox.showerror("Open failed", str(e))
+            return
+        if not data:
+            self.stop_loading()
+            self.status.set(f"Opened {os.path.basename(self.current_file)}")
+            if not self.check_queue:
+                self.finish_check()
+            return
+        # The inserted lines get queued for checking (see mark_dirty)
+        self.text.insert("end-1c", data)
+        self.loaded_chars += len(data)
+        self.status.set(f"Loading {os.path.basename(self.current_file)}... {self.loaded_chars / (1024 * 1024):.0f} MB")
+        self.root.after_idle(self.load_chunk)
+
+    def stop_loading(self):
+        if self.loading is not None:
+            self.loading.close()
+            self.loading = None
+            self.text.edit_reset()
+            self.text.configure(undo=True)
 
     def save_file(self):
+        if self.loading is not None:
+            messagebox.showwarning("Still loading", "Wait until the file has finished loading")
+            return
         if not self.current_file:
             return self.save_file_as()
         content = self.text.get(1.0, tk.END)
@@ -128,6 +393,9 @@ class SpellCheckerApp:
         self.status.set(f"Saved {os.path.basename(self.current_file)}")
 
     def save_file_as(self):
+        if self.loading is not None:
+            messagebox.showwarning("Still loading", "Wait until the file has finished loading")
+            return
         fname = filedialog.asksaveasfilename(defaultextension='.txt', filetypes=[('Text', '*.txt'), ('All files','*.*')])
         if not fname:
             return
@@ -138,82 +406,303 @@ class SpellCheckerApp:
         self.status.set(f"Saved {os.path.basename(fname)}")
 
     # --------- User dictionary ---------
-    def load_user_words(self):
-        try:
-            if os.path.exists(USER_DICT_FILE):
-                with open(USER_DICT_FILE, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        w = line.strip()
-                        if w:
-                            self.user_words.add(w.lower())
-                            self.sp.word_frequency.add(w.lower())
-        except Exception as e:
-            print("Could not load user words:", e)
-
     def add_word(self, word):
         word = word.strip()
         if not word:
             return
-        self.user_words.add(word.lower())
-        self.sp.word_frequency.add(word.lower())
-        with open(USER_DICT_FILE, 'a', encoding='utf-8') as f:
-            f.write(word + "\n")
-        self.status.set(f"Added '{word}' to user dictionary")
-        self.check_spelling()
+        try:
+            added = self.user_words.add(word)
+        except OSError as e:
+            messagebox.showerror("Add Word", f"Could not save '{word}':\n{e}")
+            return
+        if added:
+            self.learn_word(word)
+            self.status.set(f"Added '{word}' to user dictionary")
+        else:
+            self.status.set(f"'{word}' is already in the user dictionary")
+        self.untag_word(word)
+
+    def learn_word(self, word):
+        """Add a user word to the live dictionary and engine (no rebuild)"""
+        self.dictionary.add_word(word, layer="user")
+        if self.engine is not None:  # Otherwise dictionary_ready adds it
+            self.engine.add_word(word.lower())
+
+    def sync_user_words(self):
+        """Pick up words that other open instances added"""
+        for word in self.user_words.refresh():
+            self.learn_word(word)
+            self.untag_word(word)
+        self.root.after(USER_SYNC_MS, self.sync_user_words)
 
     def add_word_dialog(self):
         w = simpledialog.askstring("Add Word", "Enter word to add to dictionary:")
         if w:
             self.add_word(w)
 
+    # --------- Dictionary and suggestion engine ---------
+    def dictionary_ready(self, engine):
+        """The base words are loaded: set up suggestions (runs before any queued check)"""
+        self.engine = engine
+        if self.backend.engine_name == PYSPELLCHECKER_ENGINE:
+            self.backend.get_spell_checker().word_frequency.load_words(list(self.user_words))
+        # Remember recent suggestions (dropped when the dictionary version changes)
+        self.cache = SpellCache(self.dictionary.word_exists, self.engine.suggest, self.dictionary)
+        self.suggest = self.metrics.instrument("suggest", self.cache.suggest,
+                                               "Time to find suggestions for a misspelling")
+        if self.loading is None and not self.startup.queued:
+            self.status.set("Ready")
+
+    def loading_failed(self, error):
+        self.status.set("Dictionary failed to load")
+        messagebox.showerror("Dictionary", f"Could not load the dictionary:\n{error}")
+
+    def when_ready(self, name, func, *args):
+        """Call func(*args) now, or once the dictionary has loaded (a newer request with the same name replaces it)"""
+        if self.startup.error is not None:
+            self.status.set("Dictionary failed to load")
+        elif not self.startup.ready:
+            self.status.set("Loading dictionary... (will check when it's ready)")
+        self.startup.run(name, func, *args)
+
+    # --------- Edit tracking ---------
+    def track_edits(self):
+        """Route the Text widget's Tcl command through _text_proxy to see every edit"""
+        widget = str(self.text)
+        self.text_command = widget + "_orig"
+        self.root.tk.call("rename", widget, self.text_command)
+        self.root.tk.createcommand(widget, self._text_proxy)
+
+    def _text_proxy(self, command, *args):
+        """Run a Text widget command, marking the lines an edit touches as dirty"""
+        first_line = None
+        if command in ("insert", "delete", "replace"):
+            index = self.text.index(args[0])
+            if command == "insert" and self.text.compare(index, "==", "end"):
+                index = self.text.index("end-1c")  # Text goes before the final newline
+            first_line = int(index.split(".")[0])
+
+        result = self.root.tk.call((self.text_command, command) + args)
+
+        if first_line is not None:
+            # insert index chars ?tags chars tags ...?  /  replace index1 index2 chars ...
+            texts = args[1::2] if command == "insert" else args[2::2] if command == "replace" else ()
+            new_lines = sum(t.count("\n") for t in texts)
+            self.mark_dirty(first_line, first_line + new_lines)
+        elif command == "edit" and args and args[0] in ("undo", "redo"):
+            # Undo can change any part of the text
+            self.mark_dirty(1, int(self.text.index("end").split(".")[0]))
+        return result
+
+    def mark_dirty(self, first_line, last_line):
+        """Remember that lines first_line..last_line need re-checking"""
+        if not self.live_checking:
+            return
+        if last_line - first_line >= CHECK_BLOCK:
+            # Big edits (a file chunk, a paste, an undo) are checked in slices
+            self.queue_check(first_line, last_line)
+            return
+        self.dirty_counter += 1
+        start = f"dirty{self.dirty_counter}_start"
+        end = f"dirty{self.dirty_counter}_end"
+        self.text.mark_set(start, f"{first_line}.0")
+        self.text.mark_gravity(start, "left")
+        self.text.mark_set(end, f"{last_line}.0 lineend")
+        self.text.mark_gravity(end, "right")
+        self.dirty_marks.append((start, end))
+
+        if not self.dirty_check_pending:
+            self.dirty_check_pending = True
+            self.root.after_idle(self.check_dirty)
+
+    def clear_dirty(self):
+        for start, end in self.dirty_marks:
+            self.text.mark_unset(start, end)
+        self.dirty_marks = []
+
+    def check_dirty(self):
+        """Re-check only the lines changed since the last check"""
+        self.dirty_check_pending = False
+        ranges = []
+        for start, end in self.dirty_marks:
+            first = int(self.text.index(start).split(".")[0])
+            last = int(self.text.index(end).split(".")[0])
+            ranges.append((first, max(first, last)))
+        self.clear_dirty()
+
+        # Merge overlapping or touching ranges so no line is checked twice
+        ranges.sort()
+        merged = []
+        for first, last in ranges:
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+            else:
+                merged.append((first, last))
+
+        for first, last in merged:
+            self.check_lines_timed(first, last)
+        self.status.set(f"Found {self.count_misspelled()} possible errors")
+
+    def check_lines(self, first_line, last_line):
+        """Re-tokenize, re-check and re-tag lines first_line..last_line"""
+        start = f"{first_line}.0"
+        end = f"{last_line}.0 lineend"
+        self.text.tag_remove("misspelled", start, end)
+        self.tag_misspelled(self.find_misspelled(self.text.get(start, end), first_line))
+
+    def untag_word(self, word):
+        """Remove the highlight from every occurrence of a word that is now known"""
+        word = word.lower()
+        ranges = self.text.tag_ranges("misspelled")
+        for i in range(0, len(ranges), 2):
+            if self.text.get(ranges[i], ranges[i + 1]).lower() == word:
+                self.text.tag_remove("misspelled", ranges[i], ranges[i + 1])
+        self.status.set(f"Found {self.count_misspelled()} possible errors")
+
+    def count_misspelled(self):
+        return len(self.text.tag_ranges("misspelled")) // 2
+
     # --------- Spell checking logic ---------
-    def get_words_with_indices(self):
-        """Return list of (word, start_index, end_index) in the text widget."""
-        text = self.text.get(1.0, tk.END)
-        words = []
-        # Regex to find words (letters, apostrophes, hyphens)
-        for match in re.finditer(r"[A-Za-z\u00C0-\u017F'-]+", text):
-            w = match.group(0)
-            start_pos = match.start()
-            end_pos = match.end()
-            # convert to Tkinter index
-            start_index = f"1.0 + {start_pos} chars"
-            end_index = f"1.0 + {end_pos} chars"
-            words.append((w, start_index, end_index))
-        return words
+    def find_misspelled(self, text, first_line=1):
+        """
+        Return (start_index, end_index) of every misspelled word in text, which
+        starts at line first_line of the widget (no Tk calls, safe off the UI thread)
+        """
+        # One batched lookup for the distinct words (see document.py)
+        misspelled = check_document(text, self.dictionary)
+        return offsets_to_indices(text, misspelled, first_line)
+
+    def tag_misspelled(self, ranges):
+        """Highlight (start, end) ranges, many ranges per tag_add call"""
+        for batch, arguments in tag_batches(ranges):
+            try:
+                self.text.tag_add("misspelled", *arguments)
+            except tk.TclError:
+                # bad indices sometimes happen with unicode; tag one by one and skip those
+                for start, end in batch:
+                    try:
+                        self.text.tag_add("misspelled", start, end)
+                    except tk.TclError:
+                        continue
 
     def clear_highlights(self):
         self.text.tag_remove("misspelled", "1.0", tk.END)
+        # Until the next full check, edits don't need re-checking
+        self.live_checking = False
+        self.clear_dirty()
+        self.clear_check_queue()
 
     def check_spelling_event(self, event=None):
         self.check_spelling()
 
     def check_spelling(self):
-        self.clear_highlights()
-        content = self.text.get(1.0, tk.END)
-        if not content.strip():
+        if not self.startup.ready:
+            self.when_ready("check", self.check_spelling)
+            return
+        if not self.text.search(r"\S", "1.0", tk.END, regexp=True):
+            self.clear_highlights()
             self.status.set("No text to check")
             return
-
-        words = self.get_words_with_indices()
-        misspelled = []
-        for w, start, end in words:
-            lw = w.lower()
-            if lw in self.user_words:
-                continue
-            # numeric or single-letter words skip
-            if len(lw) == 1:
-                continue
-            if self.sp.unknown([lw]):
-                # Tag this range
-                try:
-                    self.text.tag_add("misspelled", start, end)
-                    misspelled.append((w, start, end))
-                except tk.TclError:
-                    # bad indices sometimes happen with unicode; skip
-                    continue
-
-        self.status.set(f"Found {len(misspelled)} possible errors")
+        self.clear_highlights()
+        self.start_check()
+
+    # --------- Full checks in idle-time slices ---------
+    def start_check(self):
+        """Check the whole text: visible lines first, then the rest when idle"""
+        self.live_checking = True  # From now on edits are checked as they happen
+        self.check_started = time.perf_counter()
+        self.lines_queued = 0
+        self.lines_checked = 0
+        self.status.set("Checking...")
+        self.queue_check(1, int(self.text.index("end-1c").split(".")[0]))
+
+    def queue_check(self, first_line, last_line):
+        """Add lines first_line..last_line to the lines still to check"""
+        self._add_region(len(self.check_queue), first_line, last_line)
+        self.lines_queued += last_line - first_line + 1
+        if not self.check_slice_pending:
+            self.check_slice_pending = True
+            self.root.after_idle(self.check_slice)
+
+    def _add_region(self, position, first_line, last_line):
+        """Helper: marks around lines first_line..last_line (Tk keeps them right as the text changes)"""
+        self.check_counter += 1
+        start = f"check{self.check_counter}_start"
+        end = f"check{self.check_counter}_end"
+        self.text.mark_set(start, f"{first_line}.0")
+        self.text.mark_gravity(start, "left")
+        self.text.mark_set(end, f"{last_line}.0 lineend")
+        self.text.mark_gravity(end, "right")
+        self.check_queue.insert(position, (start, end))
+
+    def clear_check_queue(self):
+        for start, end in self.check_queue:
+            self.text.mark_unset(start, end)
+        self.check_queue = []
+        self.check_started = None
+
+    def line_of(self, index):
+        return int(self.text.index(index).split(".")[0])
+
+    def next_check_block(self):
+        """
+        Take up to CHECK_BLOCK lines off the queue. Lines on screen go first,
+        so scrolling moves whatever is visible to the front; otherwise the
+        queue is worked through from the top.
+        """
+        top = self.line_of("@0,0")
+        bottom = self.line_of(f"@0,{self.text.winfo_height()}")
+
+        position = 0
+        start, end = self.check_queue[0]
+        first = self.line_of(start)
+        for i, (region_start, region_end) in enumerate(self.check_queue):
+            region_first = self.line_of(region_start)
+            if region_first <= bottom and self.line_of(region_end) >= top:
+                position, start, end = i, region_start, region_end
+                first = max(region_first, top)
+                break
+
+        region_first = self.line_of(start)
+        region_last = max(region_first, self.line_of(end))
+        first = min(first, region_last)
+        last = min(region_last, first + CHECK_BLOCK - 1)
+
+        # Put back what is left of the region, before and after the block
+        del self.check_queue[position]
+        self.text.mark_unset(start, end)
+        if last < region_last:
+            self._add_region(position, last + 1, region_last)
+        if region_first < first:
+            self._add_region(position, region_first, first - 1)
+        return first, last
+
+    def check_slice(self):
+        """Check blocks of lines for up to CHECK_SLICE seconds, then let Tk catch up"""
+        self.check_slice_pending = False
+        deadline = time.perf_counter() + CHECK_SLICE
+        while self.check_queue and time.perf_counter() < deadline:
+            first, last = self.next_check_block()
+            self.check_block(first, last)
+            self.lines_checked += last - first + 1
+
+        if self.check_queue:
+            self.check_slice_pending = True
+            self.root.after_idle(self.check_slice)
+            if self.loading is None:
+                done = min(99, 100 * self.lines_checked // max(1, self.lines_queued))
+                self.status.set(f"Checking... {done}%")
+        elif self.loading is None:
+            self.finish_check()
+
+    def finish_check(self):
+        if self.check_started is None:
+            return
+        elapsed = time.perf_counter() - self.check_started
+        self.check_started = None
+        if self.metrics.enabled:
+            self.metrics.histogram("check", "Time to check the whole document").observe(elapsed)
+        self.status.set(f"Found {self.count_misspelled()} possible errors ({elapsed:.2f}s)")
 
     # --------- Right-click suggestions & replace ---------
     def on_right_click(self, event):
@@ -233,7 +722,7 @@ class SpellCheckerApp:
             word = self.text.get(start, end)
             # build suggestion menu
             self.suggest_menu.delete(0, tk.END)
-            suggestions = list(self.sp.candidates(word.lower()))[:6]
+            suggestions = [s for _, s in self.suggest(word.lower(), 2, 6)]
             if suggestions:
                 for s in suggestions:
                     display = s
@@ -257,12 +746,28 @@ class SpellCheckerApp:
                 menu.grab_release()
 
     def replace_word(self, start, end, new_word):
+        # The edits mark this line dirty; check_dirty re-checks it when idle
         self.text.delete(start, end)
         self.text.insert(start, new_word)
-        self.check_spelling()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tkinter Spell Checker")
+    parser.add_argument("--engine", choices=ENGINE_CHOICES, default=DEFAULT_ENGINE,
+                        help="how to find suggestions (default: %(default)s)")
+    parser.add_argument("--no-metrics", dest="metrics", action="store_false",
+                        help="turn off timing of checks and suggestions")
+    parser.add_argument("--domain", action="append", default=[], metavar="NAME=PATH",
+                        help="extra word list or compiled dictionary, loaded when needed (repeatable)")
+    args = parser.parse_args()
+
+    domains = []
+    for spec in args.domain:
+        name, _, path = spec.partition("=")
+        if not name or not path:
+            parser.error(f"--domain expects NAME=PATH, got '{spec}'")
+        domains.append((name, path))
+
     root = tk.Tk()
-    app = SpellCheckerApp(root)
+    app = SpellCheckerApp(root, engine=args.engine, metrics=args.metrics, domains=domains)
     root.mainloop()
@@ -0,0 +1,382 @@
+"""
+Spell check HTTP service
+File: spell_server.py
+
+A long-running local server that keeps the dictionary loaded and answers
+JSON requests over HTTP (standard library only, built on asyncio):
+
+    GET /check?words=teh,the,wrold   -> {"results": {"teh": false, "the": true, ...}}
+    GET /suggest?word=teh&max_distance=2&limit=5
+                                     -> {"word": "teh", "suggestions": [{"word": "the", "distance": 1}, ...]}
+    GET /complete?prefix=hel&limit=10
+                                     -> {"prefix": "hel", "completions": ["help", "hello", ...]}
+    (max_distance may be 0-3 and limit 1-100; anything else is a 400 error)
+    GET /complete?prefix=hel&session=abc
+                                     -> same, but keeps a completion cursor per session, so a
+                                        client sending every keystroke pays one step per letter
+    GET /stats                       -> request counts and p50/p90/p99 latency per endpoint
+    POST /reload                     -> reloads the word list / dictionary file in the
+                                        background and swaps it in (also on SIGHUP)
+
+Requests that arrive within a short window (--batch-window, in ms) are
+grouped, so a word asked for by many clients at once is only looked up
+once. Fuzzy suggestions run on a thread pool so the event loop keeps
+accepting requests while they are computed.
+
+The dictionary is a snapshot (see reload.py): /reload builds a new one from
+the same --dict / --words files while requests keep being answered from the
+old one, then swaps it in.
+
+Usage:
+    python spell_server.py --port 8080 --dict words.dict
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from batch_check import create_suggestion_engine, load_dictionary
+from cache import LRUCache, MISSING, SpellCache
+from engines import ENGINES, DEFAULT_ENGINE
+from reload import SnapshotManager
+
+# How many recent requests each endpoint keeps for latency percentiles
+LATENCY_SAMPLES = 10000
+# Completion sessions kept, and for how long (seconds) an idle one is kept
+SESSIONS = 10000
+SESSION_TTL = 600
+# Largest max_distance and limit a request may ask for (larger ones get 400)
+MAX_DISTANCE = 3
+MAX_LIMIT = 100
+
+
+class LatencyTracker:
+    """Keeps recent request times per endpoint and reports percentiles"""
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.samples = samples
+        self.times = {}    # endpoint -> deque of seconds
+        self.counts = {}   # endpoint -> total requests
+
+    def record(self, endpoint, seconds):
+        if endpoint not in self.times:
+            self.times[endpoint] = deque(maxlen=self.samples)
+            self.counts[endpoint] = 0
+        self.times[endpoint].append(seconds)
+        self.counts[endpoint] += 1
+
+    def report(self):
+        """Request count and latency percentiles (in ms) for every endpoint"""
+        report = {}
+        for endpoint, times in self.times.items():
+            ordered = sorted(times)
+
+            def percentile(p):
+                index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+                return round(ordered[index] * 1000, 3)
+
+            report[endpoint] = {
+                "requests": self.counts[endpoint],
+                "p50_ms": percentile(50),
+                "p90_ms": percentile(90),
+                "p99_ms": percentile(99),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return report
+
+
+class MicroBatcher:
+    """
+    Groups requests that arrive within window seconds. Each distinct key is
+    processed once per batch and every waiting request gets the shared answer.
+    process_batch takes a list of keys and returns a dict key -> result.
+    With an executor, batches run there instead of on the event loop.
+    """
+    def __init__(self, process_batch, window, executor=None):
+        self.process_batch = process_batch
+        self.window = window
+        self.executor = executor
+        self.waiting = {}       # key -> list of futures
+        self.scheduled = False
+        self.batches = 0
+        self.requests = 0
+        self.keys_processed = 0
+
+    async def submit(self, key):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.waiting.setdefault(key, []).append(future)
+        self.requests += 1
+
+        if not self.scheduled:
+            self.scheduled = True
+            loop.call_later(self.window, lambda: asyncio.ensure_future(self._flush()))
+        return await future
+
+    async def _flush(self):
+        waiting = self.waiting
+        self.waiting = {}
+        self.scheduled = False
+
+        keys = list(waiting)
+        self.batches += 1
+        self.keys_processed += len(keys)
+        try:
+            if self.executor is None:
+                results = self.process_batch(keys)
+            else:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(self.executor, self.process_batch, keys)
+        except Exception as e:
+            for futures in waiting.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for key, futures in waiting.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(results[key])
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "unique_keys": self.keys_processed,
+        }
+
+
+def int_param(query, name, default, low, high):
+    """Integer query parameter between low and high (ValueError, i.e. 400, otherwise)"""
+    text = query.get(name, [str(default)])[0]
+    try:
+        value = int(text)
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number, got '{text}'")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}, got {value}")
+    return value
+
+
+class SpellServer:
+    """Answers /check, /suggest and /complete from the current dictionary snapshot"""
+    def __init__(self, snapshots, batch_window=0.002, threads=4):
+        self.snapshots = snapshots  # SnapshotManager; each batch uses snapshots.current
+        self.latency = LatencyTracker()
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.reloading = None  # Future of the reload in progress
+        self.sessions = LRUCache(SESSIONS, SESSION_TTL)  # session id -> CompletionCursor
+
+        self.check_batcher = MicroBatcher(self._check_batch, batch_window)
+        self.suggest_batcher = MicroBatcher(self._suggest_batch, batch_window, self.executor)
+        self.complete_batcher = MicroBatcher(self._complete_batch, batch_window)
+
+        self.routes = {
+            "/check": self.handle_check,
+            "/suggest": self.handle_suggest,
+            "/complete": self.handle_complete,
+            "/stats": self.handle_stats,
+            "/reload": self.handle_reload,
+        }
+
+    # --------- Batch work (runs once per unique key, on one snapshot) ---------
+    def _check_batch(self, words):
+        cache = self.snapshots.current.cache
+        return {word: cache.word_exists(word) for word in words}
+
+    def _suggest_batch(self, keys):
+        cache = self.snapshots.current.cache
+        results = {}
+        for word, max_distance, limit in keys:
+            results[(word, max_distance, limit)] = [
+                {"word": w, "distance": d} for d, w in cache.suggest(word, max_distance, limit)
+            ]
+        return results
+
+    def _complete_batch(self, keys):
+        dictionary = self.snapshots.current.dictionary
+        return {(prefix, limit): dictionary.find_suggestions(prefix, limit) for prefix, limit in keys}
+
+    # --------- Endpoints ---------
+    async def handle_check(self, query):
+        words = [w.strip().lower() for w in query.get("words", [""])[0].split(",") if w.strip()]
+        verdicts = await asyncio.gather(*(self.check_batcher.submit(w) for w in words))
+        return {"results": dict(zip(words, verdicts))}
+
+    async def handle_suggest(self, query):
+        word = query.get("word", [""])[0].strip().lower()
+        max_distance = int_param(query, "max_distance", 2, 0, MAX_DISTANCE)
+        limit = int_param(query, "limit", 10, 1, MAX_LIMIT)
+        suggestions = await self.suggest_batcher.submit((word, max_distance, limit))
+        return {"word": word, "suggestions": suggestions}
+
+    async def handle_complete(self, query):
+        prefix = query.get("prefix", [""])[0].strip().lower()
+        limit = int_param(query, "limit", 10, 1, MAX_LIMIT)
+        session = query.get("session", [""])[0]
+        if session:
+            # A cursor step is cheaper than batching, so answer right away
+            completions = self.complete_session(session, prefix, limit)
+        else:
+            completions = await self.complete_batcher.submit((prefix, limit))
+        return {"prefix": prefix, "completions": completions}
+
+    def complete_session(self, session, prefix, limit):
+        """Move the session's cursor to prefix (new cursor after a reload or a new limit)"""
+        dictionary = self.snapshots.current.dictionary
+        cursor = self.sessions.get(session)
+        if cursor is MISSING or cursor.dictionary is not dictionary or cursor.limit != limit:
+            cursor = dictionary.cursor(limit)
+        cursor.set_text(prefix)
+        self.sessions.put(session, cursor)
+        return list(cursor.completions())
+
+    async def handle_stats(self, query):
+        return {
+            "latency": self.latency.report(),
+            "batching": {
+                "check": self.check_batcher.stats(),
+                "suggest": self.suggest_batcher.stats(),
+                "complete": self.complete_batcher.stats(),
+            },
+            "cache": self.snapshots.current.cache.stats(),
+            "dictionary": self.snapshots.stats(),
+            "sessions": self.sessions.stats(),
+        }
+
+    async def handle_reload(self, query):
+        """Start a reload in the background (or report the one already running)"""
+        if self.reloading is None or self.reloading.done():
+            self.start_reload()
+            return {"status": "reloading", "version": self.snapshots.current.version}
+        return {"status": "already reloading", "version": self.snapshots.current.version}
+
+    def start_reload(self):
+        loop = asyncio.get_running_loop()
+        self.reloading = loop.run_in_executor(None, self.snapshots.reload)
+        self.reloading.add_done_callback(self._reload_done)
+
+    def _reload_done(self, future):
+        error = future.exception()
+        if error is not None:
+            print("Reload failed, still serving the old dictionary:", error)
+        else:
+            report = future.result()
+            # Session cursors point at the old dictionary and would keep it alive
+            self.sessions.clear()
+            memory = ""
+            if report["peak_rss_after_bytes"] is not None:
+                memory = (f", peak RSS {report['peak_rss_before_bytes'] / 2**20:.0f} -> "
+                          f"{report['peak_rss_after_bytes'] / 2**20:.0f} MB")
+            print(f"Reloaded dictionary v{report['version']}: {report['words']} words "
+                  f"in {report['build_seconds']}s{memory}")
+
+    # --------- HTTP ---------
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if "content-length" in headers:
+                    await reader.readexactly(int(headers["content-length"]))
+
+                status, body = await self.respond(request_line.decode('latin-1'))
+                keep_alive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(body).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, request_line):
+        """Route one request line, return (status, json_body)"""
+        parts = request_line.split()
+        if len(parts) < 2 or parts[0] not in ("GET", "POST"):
+            return "400 Bad Request", {"error": "expected 'GET /path?query'"}
+
+        url = urlsplit(parts[1])
+        handler = self.routes.get(url.path)
+        if handler is None:
+            return "404 Not Found", {"error": f"unknown endpoint {url.path}"}
+
+        start = time.perf_counter()
+        try:
+            body = await handler(parse_qs(url.query))
+        except ValueError as e:
+            return "400 Bad Request", {"error": str(e)}
+        except Exception as e:
+            return "500 Internal Server Error", {"error": str(e)}
+        self.latency.record(url.path, time.perf_counter() - start)
+        return "200 OK", body
+
+
+async def serve(server, host, port):
+    listener = await asyncio.start_server(server.handle_connection, host, port)
+    if hasattr(signal, "SIGHUP"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, server.start_reload)
+    print(f"Spell check service listening on http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the spell check HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--dict", dest="dictionary_path", help="compiled dictionary file (see dictionary_file.py)")
+    parser.add_argument("--words", dest="words_path", help="word list: one word per line, optionally with a count")
+    parser.add_argument("--engine", choices=list(ENGINES), default=DEFAULT_ENGINE,
+                        help="how to find suggestions (default: %(default)s)")
+    parser.add_argument("--max-distance", type=int, default=2,
+                        help="largest max_distance the deletes engine must answer (default: 2)")
+    parser.add_argument("--batch-window", type=float, default=2.0,
+                        help="milliseconds to wait while grouping requests (default: 2)")
+    parser.add_argument("--threads", type=int, default=4, help="threads for fuzzy suggestions (default: 4)")
+    parser.add_argument("--cache-size", type=int, default=100000,
+                        help="words to remember verdicts and suggestions for (default: 100000)")
+    parser.add_argument("--measure-reload-memory", action="store_true",
+                        help="report peak memory of each reload (tracemalloc; slows requests while reloading)")
+    args = parser.parse_args(argv)
+
+    def build():
+        """Load the dictionary and build its engine and cache (again on every reload)"""
+        dictionary = load_dictionary(args.dictionary_path, args.words_path)
+        engine = create_suggestion_engine(args.engine, dictionary, args.max_distance)
+        # Answers that stay valid across batches, for this snapshot only
+        cache = SpellCache(dictionary.word_exists, engine.suggest, dictionary, maxsize=args.cache_size)
+        return dictionary, engine, cache
+
+    snapshots = SnapshotManager(build, measure_memory=args.measure_reload_memory)
+    server = SpellServer(snapshots, args.batch_window / 1000, args.threads)
+
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
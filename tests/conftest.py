@@ -0,0 +1,29 @@
+"""Shared fixtures: the modules live at the top of the repo, not in a package"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dictionary import Trie, DEFAULT_WORDS
+
+
+@pytest.fixture(scope="session")
+def english():
+    """A Trie of pyspellchecker's English word list with its counts (a real word list)"""
+    spellchecker = pytest.importorskip("spellchecker")
+    trie = Trie()
+    for word, count in spellchecker.SpellChecker().word_frequency.items():
+        trie.add_word(word, count)
+    return trie
+
+
+@pytest.fixture
+def small():
+    """A Trie of the built-in words"""
+    trie = Trie()
+    for word in DEFAULT_WORDS:
+        trie.add_word(word)
+    return trie
@@ -0,0 +1,52 @@
+"""batch_check: the parallel mode writes exactly what the serial mode writes"""
+
+import io
+import json
+
+import batch_check
+from dictionary_file import compile_dictionary
+
+TEXT = "Teh pyton program has a bug.\nThe café databse is fine\n\n  netwrok  code, data; softwre!\n"
+
+
+def serial(dictionary, engine_name, text):
+    output = io.StringIO()
+    engine = batch_check.create_suggestion_engine(engine_name, dictionary, 2)
+    counts = batch_check.check_stream(io.BytesIO(text.encode('utf-8')), "doc.txt", dictionary, engine, output,
+                                      show_all=True)
+    return output.getvalue(), counts
+
+
+def test_parallel_matches_serial(tmp_path, small):
+    text = TEXT * 50
+    path = tmp_path / "words.dict"
+    compile_dictionary(small, path, index_distance=2)
+    expected, expected_counts = serial(small, "deletes", text)
+
+    output = io.StringIO()
+    # Chunks of a few lines, so line numbers and offsets must carry across them
+    counts = batch_check.check_parallel([("doc.txt", io.BytesIO(text.encode('utf-8')))], str(path), "deletes",
+                                        output, jobs=2, chunk_size=200, show_all=True)
+    assert output.getvalue() == expected
+    assert counts == expected_counts
+
+
+def test_results_point_at_the_word(small):
+    text, (words, misses) = serial(small, "trie", TEXT)
+    results = [json.loads(line) for line in text.splitlines()]
+    assert words == len(results) and misses == sum(not r["correct"] for r in results)
+    data = TEXT.encode('utf-8')
+    for result in results:
+        word = result["word"].encode('utf-8')
+        assert data[result["offset"]:result["offset"] + len(word)] == word
+    assert results[0]["word"] == "Teh" and "the" in results[0]["suggestions"]
+
+
+def test_main_with_jobs(tmp_path, capsys):
+    path = tmp_path / "doc.txt"
+    path.write_bytes((TEXT * 20).encode('utf-8'))
+    batch_check.main([str(path), "--jobs", "1"])
+    expected = capsys.readouterr().out
+    batch_check.main([str(path), "--jobs", "2"])
+    assert capsys.readouterr().out == expected
+    assert expected
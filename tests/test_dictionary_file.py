@@ -0,0 +1,60 @@
+"""Compiled dictionary files against the Trie they were compiled from"""
+
+import warnings
+
+import pytest
+
+from dictionary import Trie
+from dictionary_file import check_dictionary, compile_dictionary, open_dictionary
+from engines import create_engine
+
+QUERIES = ["helo", "wrld", "speling", "teh", "recieve", "progam", "qwzx"]
+
+
+@pytest.fixture
+def word_list(tmp_path, small):
+    path = tmp_path / "words.txt"
+    path.write_text("".join(f"{w} {i % 7}\n" for i, w in enumerate(small.all_words)), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("index_distance", [0, 1, 2])
+def test_round_trip(tmp_path, small, index_distance):
+    path = tmp_path / "words.dict"
+    compile_dictionary(small, path, index_distance)
+    compiled = open_dictionary(path)
+    assert sorted(compiled.words()) == sorted(small.all_words)
+    assert compiled.unknown(small.all_words + ["qwzx"]) == {"qwzx"}
+    for prefix in ["", "t", "th", "pro", "zz"]:
+        assert compiled.find_suggestions(prefix) == small.find_suggestions(prefix)
+    for query in QUERIES:
+        assert compiled.find_similar(query, 2) == small.fuzzy_search(query, 2)
+
+
+def test_deletes_engine_without_index_falls_back(tmp_path, small):
+    path = tmp_path / "words.dict"
+    compile_dictionary(small, path)
+    compiled = open_dictionary(path)
+    with pytest.warns(RuntimeWarning, match="--index-distance 2"):
+        engine = create_engine("deletes", compiled, max_distance=2)
+    for query in QUERIES:
+        assert engine.suggest(query, 2, 10) == small.fuzzy_search(query, 2)[:10]
+
+
+def test_deletes_engine_uses_the_files_index(tmp_path, small):
+    path = tmp_path / "words.dict"
+    compile_dictionary(small, path, index_distance=2)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        create_engine("deletes", open_dictionary(path), max_distance=2)
+
+
+@pytest.mark.parametrize("index_distance", [0, 2])
+def test_check_dictionary(tmp_path, word_list, index_distance):
+    path = tmp_path / "words.dict"
+    trie = Trie()
+    trie.load_word_list(word_list)
+    compile_dictionary(trie, path, index_distance)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        assert check_dictionary(word_list, path) == []
@@ -0,0 +1,60 @@
+"""Distance kernels against the full-table calculate_difference"""
+
+import random
+
+import pytest
+
+from dictionary import calculate_difference
+from distance import banded_distance, bit_parallel_distance, bounded_distance, edit_distance
+from vectorized import numpy_available
+
+
+def random_pairs(count=500, seed=1):
+    """Short words over a few letters, so many pairs are close"""
+    rng = random.Random(seed)
+    def word():
+        return "".join(rng.choice("abcde") for _ in range(rng.randint(0, 9)))
+    return [(word(), word()) for _ in range(count)]
+
+
+def test_edit_distance():
+    for word1, word2 in random_pairs():
+        assert edit_distance(word1, word2) == calculate_difference(word1, word2), (word1, word2)
+
+
+@pytest.mark.parametrize("kernel", [bounded_distance, banded_distance, bit_parallel_distance])
+@pytest.mark.parametrize("max_distance", [0, 1, 2, 3])
+def test_kernels_with_a_limit(kernel, max_distance):
+    for word1, word2 in random_pairs():
+        expected = min(calculate_difference(word1, word2), max_distance + 1)
+        assert kernel(word1, word2, max_distance) == expected, (word1, word2)
+
+
+def test_bit_parallel_without_a_limit():
+    for word1, word2 in random_pairs():
+        assert bit_parallel_distance(word1, word2) == calculate_difference(word1, word2), (word1, word2)
+
+
+def test_long_words_use_the_banded_kernel():
+    word1 = "a" * 70 + "xyz"
+    word2 = "a" * 71 + "xz"
+    assert bounded_distance(word1, word2, 3) == calculate_difference(word1, word2)
+    with pytest.raises(ValueError):
+        bit_parallel_distance(word1, word2)
+
+
+@pytest.mark.skipif(not numpy_available(), reason="NumPy is not installed")
+@pytest.mark.parametrize("max_distance", [None, 1, 2])
+def test_batch_distance(max_distance):
+    from vectorized import batch_distance, pack_words
+    rng = random.Random(2)
+    words = ["".join(rng.choice("abcde") for _ in range(6)) for _ in range(200)]
+    codes = pack_words(words)
+    for query in ["abcde", "eeaabb", "abcdea", "c"]:
+        expected = [calculate_difference(query, w) for w in words]
+        if max_distance is None:
+            assert list(batch_distance(query, codes)) == expected
+        else:
+            rows, distances = batch_distance(query, codes, max_distance)
+            assert list(rows) == [r for r, d in enumerate(expected) if d <= max_distance]
+            assert list(distances) == [d for d in expected if d <= max_distance]
@@ -0,0 +1,60 @@
+"""Every suggestion engine against a brute-force scan of the word list"""
+
+import pytest
+
+from compact_trie import CompactTrie
+from dictionary import Trie, calculate_difference
+from engines import ENGINES, create_engine
+
+QUERIES = ["teh", "pyton", "softwre", "netwrok", "data", "x", "", "algorithmm", "compter"]
+
+
+def brute_force(words, word, max_distance):
+    """Every (distance, word) within max_distance, sorted"""
+    found = ((calculate_difference(word, w), w) for w in words)
+    return sorted(pair for pair in found if pair[0] <= max_distance)
+
+
+@pytest.mark.parametrize("max_distance", [1, 2])
+def test_fuzzy_search(small, max_distance):
+    for query in QUERIES:
+        assert small.fuzzy_search(query, max_distance) == brute_force(small.all_words, query, max_distance)
+
+
+@pytest.mark.parametrize("name", list(ENGINES))
+@pytest.mark.parametrize("max_distance", [1, 2])
+def test_engine_finds_every_close_word(small, name, max_distance):
+    options = {"max_distance": max_distance} if name == "deletes" else {}
+    engine = create_engine(name, small, **options)
+    for query in QUERIES:
+        expected = brute_force(small.all_words, query, max_distance)
+        assert sorted(engine.suggest(query, max_distance, limit=1000)) == expected, query
+
+
+@pytest.mark.parametrize("name", list(ENGINES))
+def test_engine_sees_added_words(small, name):
+    engine = create_engine(name, small)
+    small.add_word("spellchecker")
+    engine.add_word("spellchecker")
+    assert (1, "spellchecker") in engine.suggest("spelchecker", 2, limit=1000)
+
+
+def test_compact_trie_matches_trie(small):
+    for word, count in [("the", 50), ("then", 7), ("there", 12)]:
+        small.add_word(word, count)
+    compact = CompactTrie.from_trie(small)
+    assert sorted(compact.all_words) == sorted(small.all_words)
+    assert compact.word_count == small.word_count
+    for word in small.all_words + ["nope", "th", ""]:
+        assert compact.word_exists(word) == small.word_exists(word), word
+        assert compact.word_frequency(word) == small.word_frequency(word), word
+    for prefix in ["", "t", "th", "pro", "da", "zz"]:
+        assert compact.find_suggestions(prefix) == small.find_suggestions(prefix), prefix
+    for query in QUERIES:
+        assert compact.fuzzy_search(query, 2) == small.fuzzy_search(query, 2), query
+
+
+def test_compact_trie_of_an_empty_trie():
+    compact = CompactTrie.from_trie(Trie())
+    assert compact.all_words == [] and not compact.word_exists("a")
+    assert compact.fuzzy_search("a", 2) == []
@@ -0,0 +1,19 @@
+"""spell_checker_tk's highlighting helpers (no window needed)"""
+
+import pytest
+
+tk_app = pytest.importorskip("spell_checker_tk")
+
+
+def test_offsets_to_indices():
+    text = "one twoo\n\nthree fourr five\nsix"
+    tokens = [(w, text.index(w), text.index(w) + len(w)) for w in ["twoo", "fourr", "six"]]
+    assert tk_app.offsets_to_indices(text, tokens) == [("1.4", "1.8"), ("3.6", "3.11"), ("4.0", "4.3")]
+    assert tk_app.offsets_to_indices(text, tokens, first_line=10)[0] == ("10.4", "10.8")
+
+
+def test_tag_batches():
+    ranges = [(f"1.{i}", f"1.{i + 1}") for i in range(5)]
+    batches = list(tk_app.tag_batches(ranges, size=2))
+    assert [batch for batch, _ in batches] == [ranges[0:2], ranges[2:4], ranges[4:5]]
+    assert batches[0][1] == ["1.0", "1.1", "1.1", "1.2"]
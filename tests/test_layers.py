@@ -0,0 +1,74 @@
+"""LayeredDictionary: lazy layers, lookups and merged results"""
+
+from engines import SoundAlikeEngine
+from layers import DictionaryLayer, LayeredDictionary, LayeredEngine
+from user_store import PersonalDictionary
+
+
+def make_layers():
+    domain = DictionaryLayer.from_words("medical", ["stethoscope", "phlebotomy"])
+    base = DictionaryLayer.from_words("base", ["the", "stethoscopes", "patient", "phone"])
+    user = DictionaryLayer.from_words("user", ["zorblax"], writable=True)
+    return LayeredDictionary([user, domain, base]), user, domain, base
+
+
+def test_known_words_never_load_the_domain_layer():
+    layered, user, domain, base = make_layers()
+    assert layered.unknown(["the", "patient"]) == set()
+    assert base.loaded and not domain.loaded and not user.loaded
+
+
+def test_completions_and_suggestions_skip_unloaded_layers():
+    layered, user, domain, base = make_layers()
+    layered.unknown(["the"])
+    engine = SoundAlikeEngine(LayeredEngine(layered), layered)
+    assert layered.find_suggestions("st") == ["stethoscopes"]
+    assert engine.suggest("stethoscop", 2, 5) == [(2, "stethoscopes")]
+    assert layered.word_frequency("phlebotomy") == 0
+    assert not domain.loaded and not user.loaded
+
+
+def test_misspelling_loads_every_layer_on_the_way():
+    layered, user, domain, base = make_layers()
+    assert layered.unknown(["stethoscop"]) == {"stethoscop"}
+    assert domain.loaded and user.loaded
+    assert layered.suggest("stethoscop", 2, 5) == [(1, "stethoscope"), (2, "stethoscopes")]
+    assert layered.find_suggestions("st") == ["stethoscope", "stethoscopes"]
+
+
+def test_inactive_layers_are_unloaded_and_skipped():
+    layered, user, domain, base = make_layers()
+    layered.unknown(["phlebotomy"])
+    layered.set_active("medical", False)
+    assert not domain.loaded
+    assert layered.unknown(["phlebotomy"]) == {"phlebotomy"}
+    assert not domain.loaded
+
+
+def test_add_word_goes_to_the_writable_layer():
+    layered, user, domain, base = make_layers()
+    layered.add_word("Grokking")
+    assert user.loaded and user.dictionary.word_exists("grokking")
+    assert layered.word_exists("grokking")
+
+
+def test_learning_a_word_before_the_user_layer_loads_counts_it_once(tmp_path):
+    # The app adds to the live word list first, then to the layer
+    user_words = PersonalDictionary(str(tmp_path / "user_words.txt"))
+    user = DictionaryLayer.from_words("user", user_words, writable=True)
+    layered = LayeredDictionary([user])
+    user_words.add("zorblax")
+    layered.add_word("zorblax", layer="user")
+    assert user.dictionary.word_frequency("zorblax") == 1
+    layered.add_word("zorblax", layer="user")  # Once loaded, adding again counts
+    assert user.dictionary.word_frequency("zorblax") == 2
+
+
+def test_load_builds_the_engine_only_when_asked():
+    layered, user, domain, base = make_layers()
+    base.load(engine=False)
+    assert base.loaded and base._engine is None
+    base.load()
+    assert base._engine is not None
+    base.unload()
+    assert not base.loaded and base._engine is None
@@ -0,0 +1,76 @@
+"""Metaphone keys, the phonetic index and sound-alike suggestions"""
+
+import pytest
+
+from compact_trie import CompactTrie
+from dictionary import Trie
+from engines import SOUND_ALIKE_BONUS, SoundAlikeEngine, create_engine, merge_sound_alikes
+from phonetic import PhoneticIndex, metaphone
+
+# The limits each GUI asks for: (max_distance, limit)
+GUI_LIMITS = [(2, 6), (3, 8)]
+
+
+@pytest.mark.parametrize("word, key", [
+    ("phone", "FN"), ("fone", "FN"), ("night", "NT"), ("nite", "NT"), ("knight", "NT"),
+    ("though", "0K"), ("school", "SKL"), ("church", "XRX"), ("dumb", "TM"), ("", ""),
+])
+def test_metaphone(word, key):
+    assert metaphone(word) == key
+
+
+def test_metaphone_with_vowels():
+    assert metaphone("nite", vowels=True) == "NITE"
+    assert metaphone("night", vowels=True) == "NIT"
+    assert metaphone("phone", vowels=True) == metaphone("fone", vowels=True)
+
+
+def test_index_lookup():
+    index = PhoneticIndex(["phone", "fine", "night"])
+    assert sorted(index.lookup("fone")) == ["fine", "phone"]
+    assert index.lookup("xyzzy") == ()
+
+
+def test_trie_index_is_opt_in():
+    trie = Trie()
+    trie.add_word("phone")
+    assert trie.phonetic_index is None
+    assert trie.find_sound_alikes("fone") == [(2, "phone")]
+    trie.add_word("fawn")  # Indexed from now on
+    assert [w for _, w in trie.find_sound_alikes("fone")] == ["phone", "fawn"]
+
+
+def test_compact_trie_matches_trie(small):
+    compact = CompactTrie.from_trie(small)
+    for word in ["fone", "nite", "teh", "skool", "wurld"]:
+        assert compact.find_sound_alikes(word, None) == small.find_sound_alikes(word, None)
+
+
+def test_max_distance_caps_sound_alikes(english):
+    for distance, _ in english.find_sound_alikes("tomorow", None, max_distance=3):
+        assert distance <= 3
+
+
+def test_merge_keeps_places():
+    close = [(1, "a"), (1, "b"), (1, "c")]
+    sound_alikes = [(1, "b"), (3, "far")]
+    merged = merge_sound_alikes(close, sound_alikes, limit=3, keep=["far"])
+    assert merged == [(1, "b"), (1, "a"), (3, "far")]
+
+
+@pytest.mark.parametrize("max_distance, limit", GUI_LIMITS)
+@pytest.mark.parametrize("typed, meant", [("fone", "phone"), ("nite", "night")])
+def test_finds_sound_alikes_edit_distance_misses(english, typed, meant, max_distance, limit):
+    engine = SoundAlikeEngine(create_engine("trie", english))
+    suggestions = [w for _, w in engine.suggest(typed, max_distance, limit)]
+    assert meant in suggestions
+    assert meant not in [w for _, w in english.fuzzy_search(typed, max_distance)[:limit]]
+
+
+@pytest.mark.parametrize("max_distance, limit", GUI_LIMITS)
+@pytest.mark.parametrize("typed", ["fone", "nite", "tomorow", "becuase", "teh", "recieve"])
+def test_suggestions_closest_first_and_capped(english, typed, max_distance, limit):
+    engine = SoundAlikeEngine(create_engine("trie", english))
+    distances = [d for d, _ in engine.suggest(typed, max_distance, limit)]
+    assert distances == sorted(distances)
+    assert max(distances) <= max_distance + SOUND_ALIKE_BONUS
@@ -0,0 +1,53 @@
+"""SnapshotManager: swapping in new dictionaries and freeing old ones"""
+
+import gc
+import weakref
+
+from dictionary import Trie
+from dictionary_file import compile_dictionary, open_dictionary
+from engines import create_engine
+from reload import SnapshotManager, resource
+
+
+def test_reload_swaps_and_reports():
+    words = [["alpha"], ["alpha", "beta"]]
+    def build():
+        trie = Trie()
+        for word in words.pop(0):
+            trie.add_word(word)
+        return trie, create_engine("trie", trie), None
+
+    manager = SnapshotManager(build)
+    reader = manager.current
+    report = manager.reload()
+    assert manager.current.version == 2 and report["words"] == 2 and report["previous_words"] == 1
+    assert not reader.dictionary.word_exists("beta")  # A reader keeps the snapshot it took
+    assert report["peak_build_bytes"] is None  # tracemalloc is opt-in
+    if resource is not None:
+        assert report["peak_rss_after_bytes"] >= report["peak_rss_before_bytes"] > 0
+
+
+def test_old_compiled_dictionary_is_freed_without_the_garbage_collector(tmp_path, small):
+    path = tmp_path / "words.dict"
+    compile_dictionary(small, path, index_distance=2)
+    dictionaries = []
+    def build():
+        dictionary = open_dictionary(path)
+        dictionaries.append(weakref.ref(dictionary))
+        engine = create_engine("deletes", dictionary, max_distance=2)
+        engine.suggest("helo", 2, 5)
+        return dictionary, engine, None
+
+    manager = SnapshotManager(build)
+    gc.disable()
+    try:
+        manager.reload()
+        assert dictionaries[0]() is None
+        assert manager.stats()["old_snapshots_alive"] == 0
+    finally:
+        gc.enable()
+
+
+def test_measure_memory_reports_a_peak():
+    manager = SnapshotManager(lambda: (Trie(), None, None), measure_memory=True)
+    assert manager.reload()["peak_build_bytes"] > 0
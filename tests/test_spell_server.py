@@ -0,0 +1,122 @@
+"""spell_server: the endpoints, their errors, and one real HTTP round trip"""
+
+import asyncio
+import json
+
+import pytest
+
+from batch_check import create_suggestion_engine, load_dictionary
+from cache import SpellCache
+from reload import SnapshotManager
+from spell_server import SpellServer
+
+
+def build():
+    dictionary = load_dictionary()
+    engine = create_suggestion_engine("trie", dictionary, 2)
+    return dictionary, engine, SpellCache(dictionary.word_exists, engine.suggest, dictionary)
+
+
+@pytest.fixture
+def server():
+    server = SpellServer(SnapshotManager(build), batch_window=0.001, threads=2)
+    yield server
+    server.executor.shutdown()
+
+
+def get(server, path, method="GET"):
+    return asyncio.run(server.respond(f"{method} {path} HTTP/1.1"))
+
+
+def test_check(server):
+    status, body = get(server, "/check?words=Data,dta,%20code%20,")
+    assert status == "200 OK"
+    assert body == {"results": {"data": True, "dta": False, "code": True}}
+
+
+def test_suggest(server):
+    status, body = get(server, "/suggest?word=pyton&max_distance=1&limit=3")
+    assert status == "200 OK"
+    assert body == {"word": "pyton", "suggestions": [{"word": "python", "distance": 1}]}
+
+
+def test_complete(server):
+    status, body = get(server, "/complete?prefix=da&limit=2")
+    assert status == "200 OK" and body["prefix"] == "da"
+    assert body["completions"] == server.snapshots.current.dictionary.find_suggestions("da", 2)
+
+
+def test_complete_session_follows_the_prefix(server):
+    async def type_word():
+        answers = []
+        for prefix in ["d", "da", "dat", "da"]:
+            answers.append(await server.respond(f"GET /complete?prefix={prefix}&session=s1 HTTP/1.1"))
+        return answers
+
+    dictionary = server.snapshots.current.dictionary
+    for (status, body), prefix in zip(asyncio.run(type_word()), ["d", "da", "dat", "da"]):
+        assert status == "200 OK"
+        assert body["completions"] == dictionary.find_suggestions(prefix, 10)
+
+
+@pytest.mark.parametrize("path", [
+    "/suggest?word=teh&max_distance=4",
+    "/suggest?word=teh&max_distance=-1",
+    "/suggest?word=teh&limit=0",
+    "/suggest?word=teh&limit=101",
+    "/suggest?word=teh&limit=ten",
+    "/complete?prefix=a&limit=1000",
+])
+def test_out_of_range_parameters_are_400(server, path):
+    status, body = get(server, path)
+    assert status == "400 Bad Request" and "error" in body
+
+
+def test_unknown_requests(server):
+    assert get(server, "/nope")[0] == "404 Not Found"
+    assert get(server, "/check", method="DELETE")[0] == "400 Bad Request"
+
+
+def test_stats_count_requests(server):
+    async def requests():
+        await server.respond("GET /check?words=data HTTP/1.1")
+        await server.respond("GET /check?words=data HTTP/1.1")
+        return await server.respond("GET /stats HTTP/1.1")
+
+    status, body = asyncio.run(requests())
+    assert status == "200 OK"
+    assert body["latency"]["/check"]["requests"] == 2
+    assert body["dictionary"]["version"] == 1
+
+
+def test_http_round_trip(server):
+    async def round_trip():
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /check?words=code HTTP/1.1\r\nHost: x\r\n\r\n"
+                         b"GET /suggest?word=dta&limit=1 HTTP/1.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            data = await reader.read()
+            writer.close()
+        return data
+
+    responses = asyncio.run(round_trip()).split(b"HTTP/1.1 ")[1:]
+    assert len(responses) == 2
+    bodies = [json.loads(r.split(b"\r\n\r\n", 1)[1]) for r in responses]
+    assert all(r.startswith(b"200 OK") for r in responses)
+    assert bodies[0] == {"results": {"code": True}}
+    assert bodies[1]["suggestions"] == [{"word": "data", "distance": 1}]
+
+
+def test_reload_swaps_the_snapshot(server, capsys):
+    async def reload():
+        status, body = await server.respond("POST /reload HTTP/1.1")
+        await server.reloading
+        return status, body
+
+    status, body = asyncio.run(reload())
+    assert status == "200 OK" and body["status"] == "reloading"
+    assert server.snapshots.current.version == 2
+    assert "Reloaded dictionary v2" in capsys.readouterr().out
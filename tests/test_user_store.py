@@ -0,0 +1,61 @@
+"""PersonalDictionary: each word once, shared between instances, compacted"""
+
+from user_store import PersonalDictionary
+
+
+def test_add_stores_each_word_once(tmp_path):
+    path = str(tmp_path / "user_words.txt")
+    store = PersonalDictionary(path)
+    assert store.add("Foo") and store.add("bar")
+    assert not store.add("foo") and not store.add("  ")
+    assert list(store) == ["foo", "bar"] and "FOO" in store
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == "foo\nbar\n"
+    assert list(PersonalDictionary(path)) == ["foo", "bar"]
+
+
+def test_refresh_picks_up_other_instances(tmp_path):
+    path = str(tmp_path / "user_words.txt")
+    first = PersonalDictionary(path)
+    second = PersonalDictionary(path)
+    first.add("alpha")
+    assert not second.add("alpha")  # Already added by the other instance
+    second.add("beta")
+    assert second.refresh() == ["alpha"]
+    assert first.refresh() == ["beta"]
+    assert first.refresh() == []
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == "alpha\nbeta\n"
+
+
+def test_file_full_of_duplicates_is_compacted(tmp_path):
+    path = tmp_path / "user_words.txt"
+    path.write_text("foo\n\nFoo\nbar\nfoo\nbar\nbaz", encoding='utf-8')  # Hand-edited, no final newline
+    store = PersonalDictionary(str(path))
+    assert list(store) == ["foo", "bar", "baz"]
+    assert path.read_text(encoding='utf-8') == "foo\nbar\nbaz\n"
+    store.add("qux")
+    assert path.read_text(encoding='utf-8') == "foo\nbar\nbaz\nqux\n"
+
+
+def test_few_duplicates_are_left_alone(tmp_path):
+    path = tmp_path / "user_words.txt"
+    text = "".join(f"word{i}\n" for i in range(20)) + "word0\n"
+    path.write_text(text, encoding='utf-8')
+    assert len(PersonalDictionary(str(path))) == 20
+    assert path.read_text(encoding='utf-8') == text
+
+
+def test_instance_keeps_reading_after_another_compacts(tmp_path):
+    path = str(tmp_path / "user_words.txt")
+    first = PersonalDictionary(path)
+    second = PersonalDictionary(path)
+    for word in ["one", "two"]:
+        first.add(word)
+    second.refresh()
+    second.compact()  # Replaces the file under the first instance
+    second.add("three")
+    assert first.refresh() == ["three"]
+    assert not first.add("three")
+    first.add("four")
+    assert second.refresh() == ["four"]
@@ -0,0 +1,186 @@
+"""
+Personal dictionary store
+File: user_store.py
+
+The personal words live in a plain text file, one word per line (the
+same format user_words.txt always had). PersonalDictionary keeps that
+file tidy and safe to share:
+
+- each word is stored once (adding a known word does nothing)
+- several editor instances can add words at the same time: appends happen
+  under a lock on a separate .lock file, and each instance picks up the
+  other instances' words with refresh(), reading only the new lines
+- a file with many duplicates or blank lines (from older versions, or
+  edited by hand) is compacted: rewritten with each word once and swapped
+  in atomically with os.replace
+
+Because of compaction, loading the file at startup costs about one line
+per unique word, however long the file's history.
+"""
+
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Compact when wasted lines (duplicates, blanks) exceed this share of the unique words
+COMPACT_RATIO = 0.2
+
+
+class FileLock:
+    """Exclusive lock on a file, shared between processes (fcntl or msvcrt)"""
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after 10 seconds; keep waiting
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.file.close()
+            self.file = None
+
+
+class PersonalDictionary:
+    """A deduplicated word file that several processes can add to"""
+    def __init__(self, path, compact_ratio=COMPACT_RATIO):
+        self.path = path
+        self.lock_path = path + ".lock"  # Never replaced, unlike the word file
+        self.compact_ratio = compact_ratio
+        self.words = {}      # word -> None, in the order they were added
+        self.pending = []    # Words read from other instances, not yet handed out by refresh()
+        self.lines = 0       # Lines read from the file, duplicates and blanks included
+        self.offset = 0      # Bytes of the file read so far
+        self.identity = None # (device, inode) of the file we read, to notice it being replaced
+        self.load()
+
+    def __contains__(self, word):
+        return word.lower() in self.words
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def load(self):
+        """Read the file, compacting it if it's full of duplicates"""
+        try:
+            with FileLock(self.lock_path):
+                self._read_new()
+                self.pending = []
+                self._compact_if_needed()
+        except OSError as e:
+            print("Could not load user words:", e)
+
+    def _read_new(self):
+        """Helper (call with the lock held): read what was appended since last time, return the new words"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        identity = (stat.st_dev, stat.st_ino)
+        if identity != self.identity or stat.st_size < self.offset:
+            # Another instance compacted the file: read it again from the start
+            self.identity = identity
+            self.offset = 0
+            self.lines = 0
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        self.offset += len(data)
+
+        new = []
+        for raw in data.splitlines():
+            self.lines += 1
+            word = raw.decode('utf-8', errors='replace').strip().lower()
+            if word and word not in self.words:
+                self.words[word] = None
+                new.append(word)
+        return new
+
+    def refresh(self):
+        """Words other instances added since the last call (already deduplicated)"""
+        try:
+            with FileLock(self.lock_path):
+                new = self.pending + self._read_new()
+                self.pending = []
+                self._compact_if_needed()
+            return new
+        except OSError as e:
+            print("Could not read user words:", e)
+            return []
+
+    def add(self, word):
+        """Store a word, returns False if it was already there"""
+        word = word.strip().lower()
+        if not word:
+            return False
+        with FileLock(self.lock_path):
+            # Another instance may have added it (or others) meanwhile
+            self.pending.extend(self._read_new())
+            if word in self.words:
+                return False
+            with open(self.path, 'a+b') as f:
+                data = (word + "\n").encode('utf-8')
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data  # Hand-edited file without a final newline
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self.words[word] = None
+            self._read_new()  # Just our own line; keeps offset and line count in step
+        return True
+
+    def _compact_if_needed(self):
+        wasted = self.lines - len(self.words)
+        if wasted > 0 and wasted >= len(self.words) * self.compact_ratio:
+            self._compact()
+
+    def compact(self):
+        """Rewrite the file with each word once"""
+        with FileLock(self.lock_path):
+            self.pending.extend(self._read_new())
+            self._compact()
+
+    def _compact(self):
+        """Helper (call with the lock held): write a fresh file and swap it in atomically"""
+        temp = self.path + ".tmp"
+        with open(temp, 'w', encoding='utf-8', newline="\n") as f:
+            for word in self.words:
+                f.write(word + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+
+        stat = os.stat(self.path)
+        self.identity = (stat.st_dev, stat.st_ino)
+        self.offset = stat.st_size
+        self.lines = len(self.words)
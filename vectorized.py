@@ -0,0 +1,174 @@
+"""
+Vectorized edit distance with NumPy
+File: vectorized.py
+
+For bulk offline correction, what matters is how many dictionary words we
+can compare per second, not how fast one query comes back. Instead of
+calling calculate_difference() once per dictionary word, WordBuckets packs
+the dictionary into integer arrays, one per word length:
+
+    codes[length]   (words, length) array of code points
+    words[length]   the words, in the same order
+
+and batch_distance() fills in the edit distance table for one query
+against a whole bucket at once: each step of the usual DP is one NumPy
+operation over every word in the bucket. A word of length L can only be
+within max_distance of the query if |L - len(query)| <= max_distance, so
+all other buckets are skipped. Rows whose smallest value is already over
+max_distance are dropped as we go.
+
+NumPy is optional: without it, numpy_available() is False and engines.py
+does not offer the "numpy" engine. It is only imported when a WordBuckets
+is first built, since importing it takes a noticeable part of startup.
+
+Usage:
+    python vectorized.py words.txt    # compares with calculate_difference()
+"""
+
+import importlib.util
+import sys
+import time
+
+np = None  # numpy, imported by load_numpy()
+
+
+def numpy_available():
+    """Is NumPy installed? (without importing it)"""
+    return np is not None or importlib.util.find_spec("numpy") is not None
+
+
+def load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def pack_words(words):
+    """Return a (len(words), length) uint32 array of code points (words must all have that length)"""
+    load_numpy()
+    length = len(words[0]) if words else 0
+    packed = np.array(words, dtype=f"<U{max(length, 1)}")
+    return packed.view(np.uint32).reshape(len(words), -1)[:, :length]
+
+
+def batch_distance(query, codes, max_distance=None):
+    """
+    Edit distance from query to every row of codes (one bucket of equal-length words).
+    With max_distance, returns (row numbers, distances) for only the rows
+    within max_distance; otherwise the distances for all rows.
+    """
+    rows, length = codes.shape
+    alive = np.arange(rows)
+    # previous[:, j] = distance between the query so far and the first j letters
+    previous = np.broadcast_to(np.arange(length + 1, dtype=np.int32), (rows, length + 1)).copy()
+
+    for i, letter in enumerate(query, start=1):
+        mismatch = codes != ord(letter)
+        current = np.empty_like(previous)
+        current[:, 0] = i
+        # Insert/delete costs and replacements don't depend on the current row
+        step = np.minimum(previous[:, 1:] + 1, previous[:, :-1] + mismatch)
+        for j in range(1, length + 1):
+            current[:, j] = np.minimum(step[:, j - 1], current[:, j - 1] + 1)
+        previous = current
+
+        if max_distance is not None:
+            # Drop words that can no longer come within max_distance
+            keep = previous.min(axis=1) <= max_distance
+            if not keep.all():
+                alive = alive[keep]
+                codes = codes[keep]
+                previous = previous[keep]
+                if not len(alive):
+                    break
+
+    distances = previous[:, length]
+    if max_distance is None:
+        return distances
+    keep = distances <= max_distance
+    return alive[keep], distances[keep]
+
+
+class WordBuckets:
+    """A word list packed into one code point array per word length"""
+    def __init__(self, words=()):
+        load_numpy()
+        self.words = {}     # length -> list of words
+        self.codes = {}     # length -> packed array, rebuilt lazily
+        self.seen = set()
+        for word in words:
+            self.add_word(word)
+
+    def add_word(self, word):
+        word = word.lower()
+        if word in self.seen:
+            return
+        self.seen.add(word)
+        self.words.setdefault(len(word), []).append(word)
+        self.codes.pop(len(word), None)  # Repack this bucket next time
+
+    def bucket(self, length):
+        """Helper: the packed array for one length (packed on first use)"""
+        codes = self.codes.get(length)
+        if codes is None:
+            codes = self.codes[length] = pack_words(self.words[length])
+        return codes
+
+    def search(self, word, max_distance):
+        """Return a sorted list of (distance, word) pairs within max_distance"""
+        word = word.lower()
+        results = []
+        for length in range(max(0, len(word) - max_distance), len(word) + max_distance + 1):
+            if length not in self.words:
+                continue
+            if length == 0:
+                results.append((len(word), ""))  # Nothing to compare letter by letter
+                continue
+            rows, distances = batch_distance(word, self.bucket(length), max_distance)
+            bucket_words = self.words[length]
+            results.extend((int(d), bucket_words[r]) for r, d in zip(rows, distances))
+        results.sort()
+        return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python vectorized.py words.txt")
+        sys.exit(1)
+    if not numpy_available():
+        print("NumPy is not installed (pip install numpy)")
+        sys.exit(1)
+
+    from dictionary import Trie, calculate_difference
+
+    trie = Trie()
+    trie.load_word_list(sys.argv[1])
+    words = sorted(set(trie.all_words))
+    queries = ["teh", "wrold", "speling", "recieve", "acommodate", "definately"]
+    max_distance = 2
+
+    start = time.perf_counter()
+    buckets = WordBuckets(words)
+    for length in buckets.words:
+        buckets.bucket(length)
+    print(f"{len(words)} words packed in {time.perf_counter() - start:.2f}s")
+
+    for query in queries:
+        start = time.perf_counter()
+        vectorized = buckets.search(query, max_distance)
+        vectorized_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loop = []
+        for w in words:
+            difference = calculate_difference(query, w)
+            if difference <= max_distance:
+                loop.append((difference, w))
+        loop.sort()
+        loop_time = time.perf_counter() - start
+
+        same = "same" if loop == vectorized else "DIFFERENT"
+        print(f"{query:>12}: {len(vectorized):3} matches, numpy {vectorized_time * 1000:8.1f} ms, "
+              f"calculate_difference {loop_time * 1000:8.1f} ms ({same})")
@@ -0,0 +1,151 @@
+"""
+Background work for the Tk apps
+File: workers.py
+
+Slow work (fuzzy suggestions, checking a whole document) must not run on
+the Tk main thread, or the window freezes until it is done. BackgroundWorker
+runs jobs on a small thread pool and hands the results back to the main
+thread through root.after.
+
+Jobs are grouped by a key such as "suggest" or "check":
+- a new job for a key makes older jobs with that key stale; stale jobs that
+  have not started are skipped and stale results are thrown away
+- delay_ms debounces: the job only starts if no newer job for the same key
+  arrives within that time (useful for <KeyRelease>)
+
+Tk itself must only be used from the main thread, so job functions must
+not touch widgets; only the callbacks may.
+
+LoadingState builds something slow (like the dictionary) with a worker so
+the window can open at once; requests made before it is ready are queued
+and run when it is.
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundWorker:
+    """Runs jobs off the Tk main thread, reporting only the newest job per key"""
+    def __init__(self, root, threads=2, poll_ms=20):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.results = queue.Queue()   # (key, number, callback, errback, result, error)
+        self.latest = {}               # key -> number of the newest job
+        self.timers = {}               # key -> after() id of a debounced job
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, key, func, args=(), callback=None, delay_ms=0, errback=None):
+        """
+        Run func(*args) in the background, then callback(result) on the main thread
+        (or errback(error) if it raised). Any older job with the same key is cancelled.
+        """
+        number = self.cancel(key)
+        job = (func, args, callback, errback)
+        if delay_ms:
+            self.timers[key] = self.root.after(delay_ms, self._start, key, number, job)
+        else:
+            self._start(key, number, job)
+
+    def cancel(self, key):
+        """Make every job with this key stale, returns the next job number"""
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            self.root.after_cancel(timer)
+        number = self.latest.get(key, 0) + 1
+        self.latest[key] = number
+        return number
+
+    def is_current(self, key, number):
+        return self.latest.get(key) == number
+
+    def _start(self, key, number, job):
+        self.timers.pop(key, None)
+        self.executor.submit(self._run, key, number, job)
+
+    def _run(self, key, number, job):
+        """Worker thread: skip stale jobs, otherwise run and queue the result"""
+        if not self.is_current(key, number):
+            return
+        func, args, callback, errback = job
+        try:
+            self.results.put((key, number, callback, errback, func(*args), None))
+        except Exception as e:
+            self.results.put((key, number, callback, errback, None, e))
+
+    def _poll(self):
+        """Main thread: deliver finished results that are still wanted"""
+        try:
+            while True:
+                try:
+                    key, number, callback, errback, result, error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if not self.is_current(key, number):
+                    continue
+                if error is not None:
+                    if errback is not None:
+                        errback(error)
+                    else:
+                        print(f"Background job '{key}' failed:", error)
+                elif callback is not None:
+                    callback(result)
+        finally:
+            # A callback that raised must not stop every later result from arriving
+            # (Tk reports the error; what is left in the queue comes next time)
+            self.root.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        for key in list(self.latest):
+            self.cancel(key)
+        self.executor.shutdown(wait=False)
+
+
+class LoadingState:
+    """
+    Runs load() on a BackgroundWorker, then on_ready(result) on the main thread.
+    Until then, run() queues requests by name (a newer request replaces an
+    older one with the same name) and they are run, in order, once loaded.
+    """
+    def __init__(self, worker, load, on_ready, on_error=None, key="load"):
+        self.ready = False
+        self.error = None
+        self.queued = {}  # name -> (func, args)
+        self.on_ready = on_ready
+        self.on_error = on_error
+        worker.submit(key, load, callback=self._loaded, errback=self._failed)
+
+    def run(self, name, func, *args):
+        """Call func(*args) now if loaded, otherwise once loading finishes"""
+        if self.ready:
+            func(*args)
+        elif self.error is None:
+            self.queued.pop(name, None)  # Keep the newest request, in arrival order
+            self.queued[name] = (func, args)
+
+    def cancel(self, name):
+        """Forget a queued request"""
+        self.queued.pop(name, None)
+
+    def _loaded(self, result):
+        try:
+            self.on_ready(result)
+        except Exception as e:
+            self._failed(e)  # Not usable, so the queued requests can't run either
+            return
+        self.ready = True
+        queued, self.queued = self.queued, {}
+        for name, (func, args) in queued.items():
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Queued request '{name}' failed:", e)
+
+    def _failed(self, error):
+        self.error = error
+        self.queued = {}
+        if self.on_error is not None:
+            self.on_error(error)
+        else:
+            print("Loading failed:", error)